@@ -6,14 +6,17 @@ Includes direct market data feeds, institutional APIs, and physical proximity op
 """
 
 import asyncio
+import os
+import sys
 import time
 import json
-import websockets
 import aiohttp
 import logging
-from collections import deque
+import socket
+import numpy as np
 import struct
 import random
+from dataclasses import dataclass, field
 
 # Minimal logging for maximum speed
 logging.basicConfig(level=logging.ERROR)
@@ -31,462 +34,537 @@ except ImportError:
     fast_json_dumps = json.dumps
     print("📊 Using standard json")
 
+try:
+    import uvloop
+    HAS_UVLOOP = True
+    print("⚡ Using uvloop event loop")
+except ImportError:
+    HAS_UVLOOP = False
+    print("📊 Using standard asyncio event loop")
+
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+# Core the measurement process is pinned to; isolate it from the scheduler with
+# isolcpus=3 on the kernel command line (GRUB) so nothing else runs there
+PINNED_CPU = 3
+PINNED_NICE = -10
+
+# In-loop progress output; set False for measurement runs so stdout writes
+# never land between msg_start and recv_time
+VERBOSE = True
+
+# Pre-sampled colocation noise values per series (wraps around when exhausted)
+NOISE_POOL_SIZE = 200_000
+
+# OKX books5 subscription, pre-serialized once and sent as a text frame without re-encoding
+_OKX_SUB_MSG = b'{"op":"subscribe","args":[{"channel":"books5","instId":"BTC-USDT"}]}'
+
+# Frame types that end a receive loop (connection gone)
+WS_CLOSED_TYPES = (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR)
+
+# Linux kernel receive timestamps (asm-generic value; the socket module doesn't export it)
+SO_TIMESTAMPNS = 35
+SCM_TIMESTAMPNS = SO_TIMESTAMPNS
+HAS_KERNEL_TIMESTAMPS = sys.platform.startswith('linux')
+
+# Malformed/unexpected frames: JSONDecodeError (both json and orjson) subclasses ValueError
+PARSE_ERRORS = (ValueError, KeyError, IndexError, AttributeError)
+
+# Prices are carried as integer micro-prices: fixed 8 decimal places
+PRICE_SCALE = 10 ** 8
+_FRACTION_SCALE = [10 ** (8 - digits) for digits in range(9)]
+
+def _ascii_to_microprice(buf):
+    """
+    ASCII decimal price bytes (b"43500.12") -> int scaled by PRICE_SCALE (4350012000000)
+    Skips float construction entirely; digits past the 8th decimal are truncated
+    """
+    dot = buf.find(b'.')
+    if dot < 0:
+        return int(buf) * PRICE_SCALE
+    fraction = buf[dot + 1:dot + 9]
+    whole = int(buf[:dot]) * PRICE_SCALE
+    if not fraction:
+        return whole
+    return whole + int(fraction) * _FRACTION_SCALE[len(fraction)]
+
+def _parse_book_ticker(msg):
+    """
+    Extract (bid, ask) micro-prices from a raw Binance bookTicker frame without a JSON parse
+    Frames have a fixed key order: {"u":...,"s":"BTCUSDT","b":"...","B":"...","a":"...","A":"..."}
+    Returns None for frames that are not book tickers
+    """
+    i = msg.find(b'"b":"', 20)
+    if i < 0:
+        return None
+    j = msg.find(b'"', i + 5)
+    k = msg.find(b'"a":"', j)
+    if k < 0:
+        return None
+    try:
+        return _ascii_to_microprice(msg[i + 5:j]), _ascii_to_microprice(msg[k + 5:msg.find(b'"', k + 5)])
+    except ValueError:
+        # Unexpected layout - fall back to a full parse
+        data = fast_json_loads(msg)
+        bid = data.get('b')
+        ask = data.get('a')
+        if bid is None or ask is None:
+            return None
+        return _ascii_to_microprice(bid.encode()), _ascii_to_microprice(ask.encode())
+
+class LatencyBuffer:
+    """
+    Preallocated float64 latency store for a whole test run
+    Run-wide mean/min reductions run in NumPy instead of Python sum()/min()
+    """
+    def __init__(self, capacity=100_000):
+        self.buf = np.empty(capacity, dtype=np.float64)
+        self.n = 0
+
+    def __len__(self):
+        return self.n
+
+    def extend(self, values):
+        end = self.n + len(values)
+        if end > len(self.buf):
+            grown = np.empty(max(end, 2 * len(self.buf)), dtype=np.float64)
+            grown[:self.n] = self.buf[:self.n]
+            self.buf = grown
+        self.buf[self.n:end] = values
+        self.n = end
+
+    def view(self):
+        return self.buf[:self.n]
+
+@dataclass
+class RunningStats:
+    """
+    O(1)-per-sample latency aggregate (replaces deque(maxlen=window) + sum()/len())
+    Tracks run-wide count/sum/min and a running sum over the last `window` samples
+    """
+    window: int = 100
+    count: int = 0
+    total: float = 0.0
+    min: float = float('inf')
+    window_sum: float = 0.0
+    ring: list = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.ring = [0.0] * self.window
+
+    def __len__(self):
+        return min(self.count, self.window)
+
+    def extend(self, values):
+        ring = self.ring
+        window = self.window
+        count = self.count
+        total = self.total
+        low = self.min
+        window_sum = self.window_sum
+        for value in values:
+            slot = count % window
+            # Swap the evicted sample out of the window sum (ring starts zeroed)
+            window_sum += value - ring[slot]
+            ring[slot] = value
+            count += 1
+            total += value
+            if value < low:
+                low = value
+        self.count = count
+        self.total = total
+        self.min = low
+        self.window_sum = window_sum
+
+    def mean(self):
+        """Mean over the last `window` samples"""
+        return self.window_sum / min(self.count, self.window)
+
+class PriceRing:
+    """
+    Fixed-size quote history as parallel int64 arrays (replaces deque of (bid, ask, ts) tuples)
+    bids/asks hold micro-prices, ts holds perf_counter_ns receive times
+    """
+    def __init__(self, capacity=50):
+        self.capacity = capacity
+        self.bids = np.zeros(capacity, dtype=np.int64)
+        self.asks = np.zeros(capacity, dtype=np.int64)
+        self.ts = np.zeros(capacity, dtype=np.int64)
+        self.idx = 0
+
+    def __len__(self):
+        return min(self.idx, self.capacity)
+
+    def append(self, bid, ask, ts):
+        slot = self.idx % self.capacity
+        self.bids[slot] = bid
+        self.asks[slot] = ask
+        self.ts[slot] = ts
+        self.idx += 1
+
+async def _receive_batch(ws):
+    """
+    Await the next frame, then drain every frame aiohttp has already buffered
+    receive() completes without yielding to the event loop while frames are queued,
+    so a burst costs one scheduler wakeup instead of one per frame
+    """
+    receive = ws.receive
+    # Private aiohttp internals with no public equivalent: without them, one frame per await
+    buffered = getattr(getattr(ws, '_reader', None), '_buffer', None)
+    batch = [await receive()]
+    while buffered and batch[-1].type not in WS_CLOSED_TYPES:
+        batch.append(await receive())
+    return batch
+
+def _open_arrival_probe(ws):
+    """
+    Kernel packet-arrival clock for the socket under a WS connection (SO_TIMESTAMPNS)
+    The transport owns the socket reads, so probe() only peeks (MSG_PEEK) at the next
+    queued segment and maps its SCM_TIMESTAMPNS onto the perf_counter_ns timeline;
+    it returns None when nothing is queued yet
+    Returns (probe, sock) or (None, None) when kernel timestamps are unavailable
+    """
+    transport_sock = ws.get_extra_info('socket') if HAS_KERNEL_TIMESTAMPS else None
+    if transport_sock is None:
+        return None, None
+    try:
+        # Duplicate fd: same kernel socket, but an object we can call recvmsg() on
+        sock = socket.socket(fileno=os.dup(transport_sock.fileno()))
+        sock.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMPNS, 1)
+    except OSError:
+        return None, None
+    
+    # SCM_TIMESTAMPNS is CLOCK_REALTIME; shift it onto perf_counter_ns once
+    realtime_offset = time.time_ns() - time.perf_counter_ns()
+    recvmsg = sock.recvmsg
+    cmsg_space = socket.CMSG_SPACE(16)
+    flags = socket.MSG_PEEK | socket.MSG_DONTWAIT
+    
+    def probe():
+        try:
+            _, ancdata, _, _ = recvmsg(1, cmsg_space, flags)
+        except (BlockingIOError, InterruptedError):
+            return None
+        for level, kind, data in ancdata:
+            if level == socket.SOL_SOCKET and kind == SCM_TIMESTAMPNS:
+                seconds, nanos = struct.unpack('qq', data)
+                return seconds * 1_000_000_000 + nanos - realtime_offset
+        return None
+    
+    return probe, sock
+
+def _parse_books5(msg):
+    """Extract (best bid, best ask) micro-prices from an OKX books5 frame; None for acks and other events"""
+    book = fast_json_loads(msg).get('data')
+    if book:
+        book_data = book[0]
+        bids = book_data.get('bids')
+        asks = book_data.get('asks')
+        if bids and asks:
+            return _ascii_to_microprice(bids[0][0].encode()), _ascii_to_microprice(asks[0][0].encode())
+    return None
+
+@dataclass(frozen=True)
+class TestConfig:
+    """Everything that differs between the colocation test scenarios"""
+    key: str                    # self.latencies series
+    exchange: str
+    connection_type: str
+    title: str                  # start line, "<title> for Ns..."
+    label: str                  # progress line prefix
+    icon: str                   # progress line icon
+    url: str
+    parse: object               # frame bytes -> (bid, ask) micro-prices or None
+    print_every: int
+    max_msg_size: int
+    subscribe: bytes = None
+    simulator: str = None       # ColocationOptimizer method name, None for a standard test
+    optimized_label: str = None
+    result_key: str = None      # result dict key for the simulated average
+    banner: tuple = ()
+    close_timeout: float = 10.0
+    headers: dict = None
+
+    @property
+    def prices_key(self):
+        return self.exchange.lower()
+
+BINANCE_URL = "wss://stream.binance.com:9443/ws/btcusdt@bookTicker"
+OKX_URL = "wss://ws.okx.com:8443/ws/v5/public"
+
+BINANCE_STANDARD = TestConfig(
+    key='binance_standard', exchange='Binance', connection_type='Standard',
+    title="📡 Testing Binance STANDARD connection", label="Binance Standard", icon="📊",
+    url=BINANCE_URL, parse=_parse_book_ticker, print_every=50, max_msg_size=1024
+)
+
+# Ultra-optimized connection settings for colocation
+BINANCE_COLOCATION = TestConfig(
+    key='binance_colocation', exchange='Binance', connection_type='Colocation (Simulated)',
+    title="🏢 Testing Binance COLOCATION SIMULATION", label="Binance Colocation", icon="🏢",
+    url=BINANCE_URL, parse=_parse_book_ticker, print_every=50,
+    max_msg_size=256,           # Minimal buffer
+    simulator='simulate_colocation_latency', optimized_label="Colocation",
+    result_key='avg_latency_colocation',
+    banner=("   📍 Simulating: AWS Tokyo (ap-northeast-1) proximity to Binance servers",),
+    close_timeout=0.01,
+    headers={'User-Agent': 'ColocationBot/1.0'}
+)
+
+OKX_STANDARD = TestConfig(
+    key='okx_standard', exchange='OKX', connection_type='Standard',
+    title="📡 Testing OKX STANDARD connection", label="OKX Standard", icon="📊",
+    url=OKX_URL, parse=_parse_books5, print_every=20, max_msg_size=1024,
+    subscribe=_OKX_SUB_MSG
+)
+
+# Institutional-grade connection settings
+OKX_INSTITUTIONAL = TestConfig(
+    key='okx_institutional', exchange='OKX', connection_type='Institutional (Simulated)',
+    title="🏛️ Testing OKX INSTITUTIONAL SIMULATION", label="OKX Institutional", icon="🏛️",
+    url=OKX_URL, parse=_parse_books5, print_every=20, max_msg_size=512,
+    subscribe=_OKX_SUB_MSG,
+    simulator='simulate_institutional_latency', optimized_label="Institutional",
+    result_key='avg_latency_institutional',
+    banner=("   📍 Simulating: Dedicated institutional WebSocket feed",
+            "   🔒 Simulating: Enhanced QoS and priority routing"),
+    close_timeout=0.01,
+    headers={'User-Agent': 'OKX-Institutional-Bot/2.0', 'X-Priority': 'high'}
+)
+
+# Premium colocation connection settings
+OKX_COLOCATION = TestConfig(
+    key='okx_colocation', exchange='OKX', connection_type='Colocation (Simulated)',
+    title="🏢 Testing OKX COLOCATION SIMULATION", label="OKX Colocation", icon="🏢",
+    url=OKX_URL, parse=_parse_books5, print_every=15,
+    max_msg_size=256,           # Ultra minimal
+    subscribe=_OKX_SUB_MSG,
+    simulator='simulate_colocation_latency', optimized_label="Colocation",
+    result_key='avg_latency_colocation',
+    banner=("   📍 Simulating: AWS Singapore (ap-southeast-1) proximity to OKX infrastructure",
+            "   🚀 Simulating: Premium colocation with direct network peering"),
+    close_timeout=0.005,        # Even faster timeout
+    headers={'User-Agent': 'OKX-Colocation-HFT/3.0', 'X-Priority': 'critical', 'X-Colocation': 'premium'}
+)
+
+def calibrate_timer_overhead(samples=10_000):
+    """Median back-to-back perf_counter_ns() delta in ns (the clock's own read cost)"""
+    perf_counter_ns = time.perf_counter_ns
+    deltas = np.empty(samples, dtype=np.int64)
+    for i in range(samples):
+        deltas[i] = -perf_counter_ns() + perf_counter_ns()
+    return int(np.median(deltas))
+
 class ColocationOptimizer:
     def __init__(self):
         self.latencies = {
-            'binance_standard': deque(maxlen=100),
-            'binance_colocation': deque(maxlen=100),
-            'okx_standard': deque(maxlen=100),
-            'okx_institutional': deque(maxlen=100),
-            'okx_colocation': deque(maxlen=100)
+            'binance_standard': RunningStats(100),
+            'binance_colocation': RunningStats(100),
+            'okx_standard': RunningStats(100),
+            'okx_institutional': RunningStats(100),
+            'okx_colocation': RunningStats(100)
         }
         self.prices = {
-            'binance': deque(maxlen=50),
-            'okx': deque(maxlen=50)
+            'binance': PriceRing(50),
+            'okx': PriceRing(50)
         }
         
+        # Colocation noise is drawn up front in one vectorized call; the per-message
+        # simulation just indexes the pools (lists, since scalar reads beat ndarray indexing)
+        rng = np.random.default_rng()
+        self._premium_reduction = rng.uniform(0.1, 0.5, NOISE_POOL_SIZE).tolist()  # 50-90% reduction
+        self._premium_overhead = rng.uniform(0.1, 0.3, NOISE_POOL_SIZE).tolist()   # 0.1-0.3ms overhead
+        self._standard_reduction = rng.uniform(0.4, 0.7, NOISE_POOL_SIZE).tolist() # 30-60% reduction
+        self._standard_overhead = rng.uniform(0.2, 0.5, NOISE_POOL_SIZE).tolist()  # 0.2-0.5ms overhead
+        self._noise_index = 0
+        
+        # Cost of the perf_counter_ns() call pair itself, subtracted from every
+        # (recv_time - msg_start) so sub-ms latencies are not biased by timer overhead
+        self._timer_overhead_ns = calibrate_timer_overhead()
+        
     def simulate_colocation_latency(self, base_latency_ms, colocation_type="premium"):
         """
         Simulate colocation latency improvements
         Premium colocation: 50-90% latency reduction
         Standard colocation: 30-60% latency reduction
         """
+        i = self._noise_index
+        self._noise_index = (i + 1) % NOISE_POOL_SIZE
         if colocation_type == "premium":
             # Premium colocation (same rack/building as exchange)
-            reduction_factor = random.uniform(0.1, 0.5)  # 50-90% reduction
-            network_overhead = random.uniform(0.1, 0.3)  # 0.1-0.3ms overhead
+            reduction_factor = self._premium_reduction[i]
+            network_overhead = self._premium_overhead[i]
         else:
             # Standard colocation (same data center)
-            reduction_factor = random.uniform(0.4, 0.7)  # 30-60% reduction
-            network_overhead = random.uniform(0.2, 0.5)  # 0.2-0.5ms overhead
+            reduction_factor = self._standard_reduction[i]
+            network_overhead = self._standard_overhead[i]
             
         colocation_latency = (base_latency_ms * reduction_factor) + network_overhead
         return max(colocation_latency, 0.1)  # Minimum 0.1ms due to hardware limits
 
-    async def test_binance_standard(self, duration=10):
-        """Test standard Binance WebSocket connection"""
-        print(f"📡 Testing Binance STANDARD connection for {duration}s...")
-        
-        latencies = []
-        message_count = 0
-        url = "wss://stream.binance.com:9443/ws/btcusdt@bookTicker"
-        
-        try:
-            async with websockets.connect(
-                url,
-                ping_interval=None,
-                max_size=1024,
-                compression=None
-            ) as ws:
-                start_time = time.perf_counter()
-                
-                while time.perf_counter() - start_time < duration:
-                    try:
-                        msg_start = time.perf_counter()
-                        msg = await ws.recv()
-                        recv_time = time.perf_counter()
-                        
-                        data = fast_json_loads(msg)
-                        if 'b' in data and 'a' in data:
-                            bid = float(data['b'])
-                            ask = float(data['a'])
-                            latency = (recv_time - msg_start) * 1000
-                            latencies.append(latency)
-                            message_count += 1
-                            
-                            self.latencies['binance_standard'].append(latency)
-                            self.prices['binance'].append((bid, ask, recv_time))
-                            
-                            if message_count % 50 == 0:
-                                avg_lat = sum(self.latencies['binance_standard']) / len(self.latencies['binance_standard'])
-                                print(f"📊 Binance Standard: {bid:.2f}/{ask:.2f} | Latency: {latency:.2f}ms | Avg: {avg_lat:.2f}ms")
-                        
-                    except Exception:
-                        continue
-                        
-        except Exception as e:
-            print(f"❌ Binance standard connection error: {e}")
-            return None
-        
-        if latencies:
-            avg_latency = sum(latencies) / len(latencies)
-            min_latency = min(latencies)
-            msg_per_sec = message_count / duration
-            
-            return {
-                'exchange': 'Binance',
-                'connection_type': 'Standard',
-                'avg_latency': avg_latency,
-                'min_latency': min_latency,
-                'msg_per_sec': msg_per_sec,
-                'total_messages': message_count
-            }
-        return None
+    def simulate_institutional_latency(self, base_latency_ms):
+        """
+        Simulate OKX institutional API improvements
+        Institutional gets priority routing + better infrastructure: 40% reduction plus minimal overhead
+        """
+        return base_latency_ms * 0.6 + random.uniform(0.1, 0.3)
 
-    async def test_binance_colocation_simulation(self, duration=10):
-        """Simulate Binance co-location with optimized connection"""
-        print(f"🏢 Testing Binance COLOCATION SIMULATION for {duration}s...")
-        print("   📍 Simulating: AWS Tokyo (ap-northeast-1) proximity to Binance servers")
+    async def _run_test(self, cfg, duration=10):
+        """
+        Run one latency test described by a TestConfig
+        Standard configs record the measured latency; simulated configs also record the
+        latency produced by cfg.simulator and report the improvement over the measured one
+        """
+        print(f"{cfg.title} for {duration}s...")
+        for line in cfg.banner:
+            print(line)
         
-        latencies = []
-        colocation_latencies = []
+        latencies = LatencyBuffer()
+        simulated_latencies = LatencyBuffer()
+        kernel_latencies = LatencyBuffer()  # Kernel segment arrival -> receive(), when a stamp was queued
         message_count = 0
-        url = "wss://stream.binance.com:9443/ws/btcusdt@bookTicker"
+        print_every = cfg.print_every
+        # Running-sum windows over the last print_every samples for the improvement line
+        actual_window = RunningStats(print_every)
+        simulated_window = RunningStats(print_every)
         
         try:
-            # Ultra-optimized connection settings for colocation
-            async with websockets.connect(
-                url,
-                ping_interval=None,
-                ping_timeout=None,
-                max_size=256,           # Minimal buffer
-                compression=None,
-                close_timeout=0.01,
-                max_queue=1,
-                read_limit=256,
-                write_limit=128,
-                # Additional optimization headers
-                extra_headers={
-                    'User-Agent': 'ColocationBot/1.0',
-                    'Connection': 'Upgrade'
-                }
+            async with aiohttp.ClientSession() as session, session.ws_connect(
+                cfg.url,
+                autoping=False,
+                compress=0,
+                max_msg_size=cfg.max_msg_size,
+                timeout=aiohttp.ClientWSTimeout(ws_close=cfg.close_timeout),
+                decode_text=False,      # Raw UTF-8 bytes straight into the parser
+                headers=cfg.headers
             ) as ws:
-                start_time = time.perf_counter()
-                
-                while time.perf_counter() - start_time < duration:
-                    try:
-                        msg_start = time.perf_counter()
-                        msg = await asyncio.wait_for(ws.recv(), timeout=0.001)
-                        recv_time = time.perf_counter()
-                        
-                        # Calculate actual latency
-                        actual_latency = (recv_time - msg_start) * 1000
+                if cfg.subscribe:
+                    await ws.send_frame(cfg.subscribe, aiohttp.WSMsgType.TEXT)
+                arrival_probe, probe_sock = _open_arrival_probe(ws)
+                try:
+                    perf_counter_ns = time.perf_counter_ns
+                    deadline = perf_counter_ns() + int(duration * 1_000_000_000)
+                    # Hot-loop names bound once: LOAD_FAST instead of global/attribute lookups
+                    receive_batch = _receive_batch
+                    closed_types = WS_CLOSED_TYPES
+                    parse = cfg.parse
+                    price_append = self.prices[cfg.prices_key].append
+                    stats = self.latencies[cfg.key]
+                    simulate = getattr(self, cfg.simulator) if cfg.simulator else None
+                    verbose = VERBOSE
+                    timer_overhead_ns = self._timer_overhead_ns
+                    write = sys.stdout.write
+                    
+                    # receive() reports disconnects as CLOSE/CLOSED/ERROR messages rather than
+                    # raising, so the await needs no try frame; closure breaks out below
+                    while perf_counter_ns() < deadline:
+                        # Kernel stamp of the next segment queued on the socket. It need not belong to
+                        # the frame receive() returns (that one may already sit in aiohttp's buffer),
+                        # so it feeds a separate series and never replaces the await timing
+                        arrival_ns = arrival_probe() if arrival_probe is not None else None
+                        msg_start = perf_counter_ns()
+                        batch = await receive_batch(ws)
+                        recv_time = perf_counter_ns()
                         
-                        # Simulate colocation improvement
-                        colocation_latency = self.simulate_colocation_latency(actual_latency, "premium")
+                        actual_latency = (recv_time - msg_start - timer_overhead_ns) / 1_000_000  # ns -> ms
+                        quotes = 0
+                        waited = False  # The awaited first frame parsed to a quote
+                        first = batch[0]
+                        for msg in batch:
+                            if msg.type in closed_types:
+                                break
+                            try:
+                                quote = parse(msg.data)
+                            except PARSE_ERRORS:
+                                continue
+                            if quote:
+                                bid, ask = quote
+                                price_append(bid, ask, recv_time)
+                                quotes += 1
+                                if msg is first:
+                                    waited = True
                         
-                        data = fast_json_loads(msg)
-                        if 'b' in data and 'a' in data:
-                            bid = float(data['b'])
-                            ask = float(data['a'])
-                            latencies.append(actual_latency)
-                            colocation_latencies.append(colocation_latency)
-                            message_count += 1
-                            
-                            self.latencies['binance_colocation'].append(colocation_latency)
-                            self.prices['binance'].append((bid, ask, recv_time))
+                        if quotes:
+                            # Only the first frame waited on the socket and has a latency to record;
+                            # drained frames were already queued, so they count toward msg/s only
+                            if waited:
+                                sample = (actual_latency,)
+                                latencies.extend(sample)
+                                if simulate is None:
+                                    stats.extend(sample)
+                                else:
+                                    simulated_latency = simulate(actual_latency)
+                                    simulated_sample = (simulated_latency,)
+                                    simulated_latencies.extend(simulated_sample)
+                                    stats.extend(simulated_sample)
+                                    actual_window.extend(sample)
+                                    simulated_window.extend(simulated_sample)
+                                last_latency = actual_latency
+                                if arrival_ns is not None:
+                                    kernel_latencies.extend(((recv_time - arrival_ns) / 1_000_000,))
+                            prev_count = message_count
+                            message_count += quotes
                             
-                            if message_count % 50 == 0:
-                                avg_actual = sum(latencies[-50:]) / min(50, len(latencies))
-                                avg_colo = sum(colocation_latencies[-50:]) / min(50, len(colocation_latencies))
-                                improvement = ((avg_actual - avg_colo) / avg_actual) * 100
-                                print(f"🏢 Binance Colocation: {bid:.2f}/{ask:.2f}")
-                                print(f"   📡 Standard: {actual_latency:.2f}ms → 🏢 Colocation: {colocation_latency:.2f}ms ({improvement:.1f}% faster)")
+                            if verbose and latencies and message_count // print_every != prev_count // print_every:
+                                # One formatted block, one write() per progress event
+                                if simulate is None:
+                                    avg_lat = stats.mean()
+                                    write(f"{cfg.icon} {cfg.label}: {bid / PRICE_SCALE:.2f}/{ask / PRICE_SCALE:.2f} | Latency: {last_latency:.2f}ms | Avg: {avg_lat:.2f}ms\n")
+                                else:
+                                    avg_actual = actual_window.mean()
+                                    avg_simulated = simulated_window.mean()
+                                    improvement = ((avg_actual - avg_simulated) / avg_actual) * 100
+                                    write(
+                                        f"{cfg.icon} {cfg.label}: {bid / PRICE_SCALE:.2f}/{ask / PRICE_SCALE:.2f}\n"
+                                        f"   📡 Standard: {last_latency:.2f}ms → {cfg.icon} {cfg.optimized_label}: {simulated_latency:.2f}ms ({improvement:.1f}% faster)\n"
+                                    )
                         
-                    except asyncio.TimeoutError:
-                        continue
-                    except Exception:
-                        continue
-                        
-        except Exception as e:
-            print(f"❌ Binance colocation simulation error: {e}")
+                        if batch[-1].type in closed_types:
+                            break
+                finally:
+                    # The probe owns a dup'd fd; close it even when the loop raises
+                    if probe_sock is not None:
+                        probe_sock.close()
+        
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            print(f"❌ {cfg.label} {'simulation' if cfg.simulator else 'connection'} error: {e}")
             return None
         
-        if latencies and colocation_latencies:
-            avg_standard = sum(latencies) / len(latencies)
-            avg_colocation = sum(colocation_latencies) / len(colocation_latencies)
-            min_colocation = min(colocation_latencies)
-            improvement = ((avg_standard - avg_colocation) / avg_standard) * 100
-            msg_per_sec = message_count / duration
-            
-            return {
-                'exchange': 'Binance',
-                'connection_type': 'Colocation (Simulated)',
-                'avg_latency_standard': avg_standard,
-                'avg_latency_colocation': avg_colocation,
-                'min_latency': min_colocation,
-                'improvement_percent': improvement,
-                'msg_per_sec': msg_per_sec,
-                'total_messages': message_count
-            }
-        return None
-
-    async def test_okx_standard(self, duration=10):
-        """Test standard OKX WebSocket connection"""
-        print(f"📡 Testing OKX STANDARD connection for {duration}s...")
-        
-        latencies = []
-        message_count = 0
-        url = "wss://ws.okx.com:8443/ws/v5/public"
-        
-        subscribe_msg = fast_json_dumps({
-            "op": "subscribe", 
-            "args": [{"channel": "books5", "instId": "BTC-USDT"}]
-        })
-        
-        try:
-            async with websockets.connect(
-                url,
-                ping_interval=None,
-                max_size=1024,
-                compression=None
-            ) as ws:
-                await ws.send(subscribe_msg)
-                start_time = time.perf_counter()
-                
-                while time.perf_counter() - start_time < duration:
-                    try:
-                        msg_start = time.perf_counter()
-                        msg = await ws.recv()
-                        recv_time = time.perf_counter()
-                        
-                        data = fast_json_loads(msg)
-                        if 'data' in data and data['data']:
-                            book_data = data['data'][0]
-                            bids = book_data.get('bids', [])
-                            asks = book_data.get('asks', [])
-                            
-                            if bids and asks:
-                                bid = float(bids[0][0])
-                                ask = float(asks[0][0])
-                                latency = (recv_time - msg_start) * 1000
-                                latencies.append(latency)
-                                message_count += 1
-                                
-                                self.latencies['okx_standard'].append(latency)
-                                self.prices['okx'].append((bid, ask, recv_time))
-                                
-                                if message_count % 20 == 0:
-                                    avg_lat = sum(self.latencies['okx_standard']) / len(self.latencies['okx_standard'])
-                                    print(f"📊 OKX Standard: {bid:.2f}/{ask:.2f} | Latency: {latency:.2f}ms | Avg: {avg_lat:.2f}ms")
-                        
-                    except Exception:
-                        continue
-                        
-        except Exception as e:
-            print(f"❌ OKX standard connection error: {e}")
+        if not latencies:
             return None
         
-        if latencies:
-            avg_latency = sum(latencies) / len(latencies)
-            min_latency = min(latencies)
-            msg_per_sec = message_count / duration
-            
+        msg_per_sec = message_count / duration
+        # Reported apart from the await timing, never mixed into the latency averages
+        kernel = {'avg_kernel_arrival_latency': float(kernel_latencies.view().mean())} if kernel_latencies else {}
+        if cfg.simulator is None:
             return {
-                'exchange': 'OKX',
-                'connection_type': 'Standard',
-                'avg_latency': avg_latency,
-                'min_latency': min_latency,
+                'exchange': cfg.exchange,
+                'connection_type': cfg.connection_type,
+                'avg_latency': float(latencies.view().mean()),
+                'min_latency': float(latencies.view().min()),
                 'msg_per_sec': msg_per_sec,
-                'total_messages': message_count
+                'total_messages': message_count,
+                **kernel
             }
-        return None
-
-    async def test_okx_institutional_simulation(self, duration=10):
-        """Simulate OKX Institutional API with dedicated infrastructure"""
-        print(f"🏛️ Testing OKX INSTITUTIONAL SIMULATION for {duration}s...")
-        print("   📍 Simulating: Dedicated institutional WebSocket feed")
-        print("   🔒 Simulating: Enhanced QoS and priority routing")
-        
-        latencies = []
-        institutional_latencies = []
-        message_count = 0
-        
-        # Use AWS Singapore for better OKX connectivity (closer to their infrastructure)
-        url = "wss://ws.okx.com:8443/ws/v5/public"
-        
-        subscribe_msg = fast_json_dumps({
-            "op": "subscribe", 
-            "args": [{"channel": "books5", "instId": "BTC-USDT"}]
-        })
-        
-        try:
-            # Institutional-grade connection settings
-            async with websockets.connect(
-                url,
-                ping_interval=None,
-                ping_timeout=None,
-                max_size=512,
-                compression=None,
-                close_timeout=0.01,
-                max_queue=1,
-                read_limit=512,
-                write_limit=256,
-                extra_headers={
-                    'User-Agent': 'OKX-Institutional-Bot/2.0',
-                    'X-Priority': 'high',
-                    'Connection': 'Upgrade'
-                }
-            ) as ws:
-                await ws.send(subscribe_msg)
-                start_time = time.perf_counter()
-                
-                while time.perf_counter() - start_time < duration:
-                    try:
-                        msg_start = time.perf_counter()
-                        msg = await asyncio.wait_for(ws.recv(), timeout=0.001)
-                        recv_time = time.perf_counter()
-                        
-                        # Calculate actual latency
-                        actual_latency = (recv_time - msg_start) * 1000
-                        
-                        # Simulate institutional improvements
-                        # Institutional gets priority routing + better infrastructure
-                        institutional_latency = actual_latency * 0.6  # 40% improvement
-                        institutional_latency += random.uniform(0.1, 0.3)  # Add minimal overhead
-                        
-                        data = fast_json_loads(msg)
-                        if 'data' in data and data['data']:
-                            book_data = data['data'][0]
-                            bids = book_data.get('bids', [])
-                            asks = book_data.get('asks', [])
-                            
-                            if bids and asks:
-                                bid = float(bids[0][0])
-                                ask = float(asks[0][0])
-                                latencies.append(actual_latency)
-                                institutional_latencies.append(institutional_latency)
-                                message_count += 1
-                                
-                                self.latencies['okx_institutional'].append(institutional_latency)
-                                self.prices['okx'].append((bid, ask, recv_time))
-                                
-                                if message_count % 20 == 0:
-                                    avg_actual = sum(latencies[-20:]) / min(20, len(latencies))
-                                    avg_inst = sum(institutional_latencies[-20:]) / min(20, len(institutional_latencies))
-                                    improvement = ((avg_actual - avg_inst) / avg_actual) * 100
-                                    print(f"🏛️ OKX Institutional: {bid:.2f}/{ask:.2f}")
-                                    print(f"   📡 Standard: {actual_latency:.2f}ms → 🏛️ Institutional: {institutional_latency:.2f}ms ({improvement:.1f}% faster)")
-                        
-                    except asyncio.TimeoutError:
-                        continue
-                    except Exception:
-                        continue
-                        
-        except Exception as e:
-            print(f"❌ OKX institutional simulation error: {e}")
-            return None
         
-        if latencies and institutional_latencies:
-            avg_standard = sum(latencies) / len(latencies)
-            avg_institutional = sum(institutional_latencies) / len(institutional_latencies)
-            min_institutional = min(institutional_latencies)
-            improvement = ((avg_standard - avg_institutional) / avg_standard) * 100
-            msg_per_sec = message_count / duration
-            
-            return {
-                'exchange': 'OKX',
-                'connection_type': 'Institutional (Simulated)',
-                'avg_latency_standard': avg_standard,
-                'avg_latency_institutional': avg_institutional,
-                'min_latency': min_institutional,
-                'improvement_percent': improvement,
-                'msg_per_sec': msg_per_sec,
-                'total_messages': message_count
-            }
-        return None
-
-    async def test_okx_colocation_simulation(self, duration=10):
-        """Simulate OKX co-location with premium infrastructure"""
-        print(f"🏢 Testing OKX COLOCATION SIMULATION for {duration}s...")
-        print("   📍 Simulating: AWS Singapore (ap-southeast-1) proximity to OKX infrastructure")
-        print("   🚀 Simulating: Premium colocation with direct network peering")
-        
-        latencies = []
-        colocation_latencies = []
-        message_count = 0
-        
-        url = "wss://ws.okx.com:8443/ws/v5/public"
-        
-        subscribe_msg = fast_json_dumps({
-            "op": "subscribe", 
-            "args": [{"channel": "books5", "instId": "BTC-USDT"}]
-        })
-        
-        try:
-            # Premium colocation connection settings
-            async with websockets.connect(
-                url,
-                ping_interval=None,
-                ping_timeout=None,
-                max_size=256,           # Ultra minimal
-                compression=None,
-                close_timeout=0.005,    # Even faster timeout
-                max_queue=1,
-                read_limit=256,
-                write_limit=128,
-                extra_headers={
-                    'User-Agent': 'OKX-Colocation-HFT/3.0',
-                    'X-Priority': 'critical',
-                    'X-Colocation': 'premium',
-                    'Connection': 'Upgrade'
-                }
-            ) as ws:
-                await ws.send(subscribe_msg)
-                start_time = time.perf_counter()
-                
-                while time.perf_counter() - start_time < duration:
-                    try:
-                        msg_start = time.perf_counter()
-                        msg = await asyncio.wait_for(ws.recv(), timeout=0.0005)  # Ultra-fast timeout
-                        recv_time = time.perf_counter()
-                        
-                        # Calculate actual latency
-                        actual_latency = (recv_time - msg_start) * 1000
-                        
-                        # Simulate premium colocation improvement
-                        colocation_latency = self.simulate_colocation_latency(actual_latency, "premium")
-                        
-                        data = fast_json_loads(msg)
-                        if 'data' in data and data['data']:
-                            book_data = data['data'][0]
-                            bids = book_data.get('bids', [])
-                            asks = book_data.get('asks', [])
-                            
-                            if bids and asks:
-                                bid = float(bids[0][0])
-                                ask = float(asks[0][0])
-                                latencies.append(actual_latency)
-                                colocation_latencies.append(colocation_latency)
-                                message_count += 1
-                                
-                                self.latencies['okx_colocation'].append(colocation_latency)
-                                self.prices['okx'].append((bid, ask, recv_time))
-                                
-                                if message_count % 15 == 0:
-                                    avg_actual = sum(latencies[-15:]) / min(15, len(latencies))
-                                    avg_colo = sum(colocation_latencies[-15:]) / min(15, len(colocation_latencies))
-                                    improvement = ((avg_actual - avg_colo) / avg_actual) * 100
-                                    print(f"🏢 OKX Colocation: {bid:.2f}/{ask:.2f}")
-                                    print(f"   📡 Standard: {actual_latency:.2f}ms → 🏢 Colocation: {colocation_latency:.2f}ms ({improvement:.1f}% faster)")
-                        
-                    except asyncio.TimeoutError:
-                        continue
-                    except Exception:
-                        continue
-                        
-        except Exception as e:
-            print(f"❌ OKX colocation simulation error: {e}")
-            return None
-        
-        if latencies and colocation_latencies:
-            avg_standard = sum(latencies) / len(latencies)
-            avg_colocation = sum(colocation_latencies) / len(colocation_latencies)
-            min_colocation = min(colocation_latencies)
-            improvement = ((avg_standard - avg_colocation) / avg_standard) * 100
-            msg_per_sec = message_count / duration
-            
-            return {
-                'exchange': 'OKX',
-                'connection_type': 'Colocation (Simulated)',
-                'avg_latency_standard': avg_standard,
-                'avg_latency_colocation': avg_colocation,
-                'min_latency': min_colocation,
-                'improvement_percent': improvement,
-                'msg_per_sec': msg_per_sec,
-                'total_messages': message_count
-            }
-        return None
+        avg_standard = float(latencies.view().mean())
+        avg_simulated = float(simulated_latencies.view().mean())
+        improvement = ((avg_standard - avg_simulated) / avg_standard) * 100
+        return {
+            'exchange': cfg.exchange,
+            'connection_type': cfg.connection_type,
+            'avg_latency_standard': avg_standard,
+            cfg.result_key: avg_simulated,
+            'min_latency': float(simulated_latencies.view().min()),
+            'improvement_percent': improvement,
+            'msg_per_sec': msg_per_sec,
+            'total_messages': message_count,
+            **kernel
+        }
 
     def print_colocation_info(self):
         """Print detailed colocation information"""
@@ -526,8 +604,35 @@ class ColocationOptimizer:
         print("   ⚡ OKX + Premium Colocation: 3-15ms")
         print("   📊 ROI Break-even: ~$50,000+ daily volume")
 
+def pin_to_cpu(cpu=PINNED_CPU, niceness=PINNED_NICE):
+    """
+    Pin this process to one core and raise its scheduling priority
+    Keeps scheduler migrations and cache eviction out of the sub-ms latency numbers,
+    so the histograms measure network + protocol rather than OS jitter
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        allowed = os.sched_getaffinity(0)
+    elif HAS_PSUTIL:
+        allowed = set(psutil.Process().cpu_affinity())
+    else:
+        print("📊 CPU pinning unavailable on this platform")
+        return
+    if cpu not in allowed:
+        cpu = max(allowed)
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, {cpu})
+    else:
+        psutil.Process().cpu_affinity([cpu])
+    print(f"📌 Pinned to CPU {cpu}")
+    try:
+        os.nice(niceness - os.nice(0))
+        print(f"⚡ Scheduling priority raised (nice {niceness})")
+    except (PermissionError, AttributeError):
+        print("📊 Running at default priority (raising it needs root/CAP_SYS_NICE)")
+
 async def main():
     """Run comprehensive colocation testing and analysis"""
+    pin_to_cpu()
     optimizer = ColocationOptimizer()
     
     print("🏢 COLOCATION OPTIMIZER FOR BINANCE & OKX INSTITUTIONAL")
@@ -543,30 +648,33 @@ async def main():
     
     # Test scenarios in order of increasing optimization
     tests = [
-        ("Binance Standard", optimizer.test_binance_standard),
-        ("OKX Standard", optimizer.test_okx_standard),
-        ("OKX Institutional", optimizer.test_okx_institutional_simulation),
-        ("Binance Colocation", optimizer.test_binance_colocation_simulation),
-        ("OKX Colocation", optimizer.test_okx_colocation_simulation),
+        ("Binance Standard", BINANCE_STANDARD),
+        ("OKX Standard", OKX_STANDARD),
+        ("OKX Institutional", OKX_INSTITUTIONAL),
+        ("Binance Colocation", BINANCE_COLOCATION),
+        ("OKX Colocation", OKX_COLOCATION),
     ]
     
-    print(f"\n🧪 RUNNING TESTS ({test_duration}s each)...")
+    print(f"\n🧪 RUNNING TESTS ({test_duration}s, all concurrently)...")
     print("=" * 50)
     
-    for test_name, test_func in tests:
-        print(f"\n🔬 Starting: {test_name}")
-        try:
-            result = await test_func(test_duration)
-            if result:
-                results.append(result)
-                print(f"✅ Completed: {test_name}")
-            else:
-                print(f"❌ Failed: {test_name}")
-        except Exception as e:
-            print(f"💥 Error in {test_name}: {e}")
-        
-        # Brief pause between tests
-        await asyncio.sleep(1)
+    # Each test owns its own socket and is IO-bound, so they share one event loop
+    # and the whole suite takes ~one test duration instead of the sum
+    for test_name, _ in tests:
+        print(f"🔬 Starting: {test_name}")
+    outcomes = await asyncio.gather(
+        *(optimizer._run_test(cfg, test_duration) for _, cfg in tests),
+        return_exceptions=True
+    )
+    
+    for (test_name, _), result in zip(tests, outcomes):
+        if isinstance(result, Exception):
+            print(f"💥 Error in {test_name}: {result}")
+        elif result:
+            results.append(result)
+            print(f"✅ Completed: {test_name}")
+        else:
+            print(f"❌ Failed: {test_name}")
     
     # Print comprehensive results
     print("\n" + "🏆" * 60)
@@ -589,6 +697,8 @@ async def main():
                 print(f"      🚀 Min Latency: {result['min_latency']:.2f}ms")
             else:
                 print(f"   📊 {connection_type}: {result['avg_latency']:.2f}ms avg")
+            if 'avg_kernel_arrival_latency' in result:
+                print(f"      ⏱️ Kernel segment arrival → receive: {result['avg_kernel_arrival_latency']:.2f}ms")
         
         print("\n📊 OKX RESULTS:")
         for result in okx_results:
@@ -601,6 +711,8 @@ async def main():
                 print(f"      🚀 Min Latency: {result['min_latency']:.2f}ms")
             else:
                 print(f"   📊 {connection_type}: {result['avg_latency']:.2f}ms avg")
+            if 'avg_kernel_arrival_latency' in result:
+                print(f"      ⏱️ Kernel segment arrival → receive: {result['avg_kernel_arrival_latency']:.2f}ms")
         
         # Best performance summary
         print("\n🏅 BEST PERFORMANCE ACHIEVED:")
@@ -644,6 +756,8 @@ async def main():
         print("❌ No successful tests completed")
 
 if __name__ == "__main__":
+    if HAS_UVLOOP:
+        uvloop.install()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -9,395 +9,483 @@ Final attempt to achieve sub-20ms latency using the most aggressive techniques p
 """
 
 import asyncio
+import gc
+import sys
 import time
-import json
-import websockets
+import aiohttp
 import logging
-import re
+import numpy as np
 from collections import deque
+from dataclasses import dataclass
 
 # Disable all logging for maximum performance
 logging.disable(logging.CRITICAL)
 
+# Single-threaded: stretch the GIL switch check from 5ms to 1s so the eval loop
+# isn't interrupted for drop/reacquire requests mid-message.
+# Best paired with a PGO+LTO CPython build (--enable-optimizations --with-lto)
+sys.setswitchinterval(1.0)
+
+# orjson is required: fail fast at startup rather than silently measuring stdlib json
+import orjson
+parse_json = orjson.loads
+print("🔥 Using orjson (FASTEST)")
+
+try:
+    import _extreme_parse  # cythonize -3 -i _extreme_parse.pyx
+    HAS_C_PARSER = True
+    print("⚡ Using C frame scanners (_extreme_parse)")
+except ImportError:
+    HAS_C_PARSER = False
+    print("📊 Using pure Python frame scanners")
+
+try:
+    from pytdigest import TDigest
+    HAS_TDIGEST = True
+    print("📊 Using t-digest streaming percentiles")
+except ImportError:
+    HAS_TDIGEST = False
+    print("📊 Using windowed percentiles (pytdigest not installed)")
+
+try:
+    import uvloop
+    HAS_UVLOOP = True
+    print("⚡ Using uvloop event loop")
+except ImportError:
+    HAS_UVLOOP = False
+    print("📊 Using standard asyncio event loop")
+
+# Latency samples kept per test when percentiles can't be streamed (no pytdigest);
+# they then cover the most recent window
+LATENCY_WINDOW = 20_000
+# Samples buffered in the hot loop before one vectorized LatencyDigest.extend()
+DIGEST_CHUNK = 256
+
+# Context-manager timeout: arms a timer handle on the current task instead of
+# wrapping every recv() in a new Task like asyncio.wait_for does
 try:
-    import orjson
-    HAS_ORJSON = True
-    parse_json = orjson.loads
-    print("🔥 Using orjson (FASTEST)")
+    from asyncio import timeout as _timeout  # Python 3.11+
 except ImportError:
-    HAS_ORJSON = False
-    parse_json = json.loads
-    print("📊 Using standard json")
+    from async_timeout import timeout as _timeout
+
+def _to_ticks(price):
+    """
+    Decimal price (bytes from the scanners, str from the JSON fallback) -> int cents
+    BTCUSDT trades at a 0.01 tick, so two fraction digits are exact; no float round-trip
+    The C scanners already hand back doubles, which are just rounded to the tick
+    """
+    if isinstance(price, float):
+        return round(price * 100)
+    dot = price.find('.' if isinstance(price, str) else b'.')
+    if dot < 0:
+        return int(price) * 100
+    cents = price[dot + 1:dot + 3]
+    if not cents:
+        return int(price[:dot]) * 100
+    return int(price[:dot]) * 100 + int(cents) * (10 if len(cents) == 1 else 1)
+
+def _format_ticks(ticks):
+    return f"{ticks // 100}.{ticks % 100:02d}"
+
+class LatencyDigest:
+    """
+    Constant-memory latency summary, fed in DIGEST_CHUNK-sized batches
+    Count/sum/min/max and the <15ms/<20ms counters are exact; percentiles come from a
+    t-digest, or from the last LATENCY_WINDOW samples when pytdigest isn't installed
+    """
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+        self.under_15ms = 0
+        self.under_20ms = 0
+        self._digest = TDigest() if HAS_TDIGEST else None
+        self._window = None if HAS_TDIGEST else deque(maxlen=LATENCY_WINDOW)
+    
+    def extend(self, values):
+        if not values:
+            return
+        chunk = np.array(values, dtype=np.float64)
+        self.count += len(chunk)
+        self.total += float(chunk.sum())
+        self.min = min(self.min, float(chunk.min()))
+        self.max = max(self.max, float(chunk.max()))
+        self.under_15ms += int(np.count_nonzero(chunk < 15))
+        self.under_20ms += int(np.count_nonzero(chunk < 20))
+        if self._digest is not None:
+            self._digest.update(chunk)
+        else:
+            self._window.extend(values)
+    
+    def mean(self):
+        return self.total / self.count
+    
+    def percentiles(self, quantiles):
+        if self._digest is not None:
+            return [float(p) for p in self._digest.inverse_cdf(quantiles)]
+        # One O(n) np.partition pass at the nearest-rank indices, no full sort
+        lat = np.fromiter(self._window, dtype=np.float64, count=len(self._window))
+        ranks = [int(len(lat) * q) for q in quantiles]
+        part = np.partition(lat, ranks)
+        return [float(part[k]) for k in ranks]
+
+@dataclass(frozen=True)
+class ExtremeConfig:
+    """Everything that differs between the per-exchange extreme tests"""
+    exchange: str
+    title: str                  # start banner, followed by " for {duration}s..."
+    url: str
+    reader: str                 # ExtremeOptimizer method: frame bytes -> (server ts ms or None, bid, ask) or None
+    connect_kwargs: dict        # aiohttp ws_connect() options
+    subscribe: bytes = None
+    recv_timeout: float = None  # None = wait indefinitely
+    report_every: int = 20
+    avg_window: int = 10
+    percentiles: bool = True    # Full P50/P90/P95 and <15ms report
+    inter_arrival: bool = False # No server timestamp: measures the gap between frames, not latency
+
+# Most aggressive settings possible
+AGGRESSIVE_CONNECT = dict(
+    autoping=False,
+    heartbeat=None,
+    max_msg_size=256,     # Tiny buffer
+    compress=0,           # No compression
+    decode_text=False,    # Raw UTF-8 bytes, no per-frame decode/validation
+    timeout=aiohttp.ClientWSTimeout(ws_close=0.01)  # Immediate close
+)
+
+# Fast connection: bound the TCP connect, not the long-lived socket
+CONNECT_TIMEOUT = aiohttp.ClientTimeout(sock_connect=3)
+
+# Frame types that end a receive loop (connection gone)
+WS_CLOSED_TYPES = (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR)
+
+# Malformed/unexpected frames: orjson.JSONDecodeError subclasses ValueError
+PARSE_ERRORS = (ValueError, KeyError, IndexError, TypeError, AttributeError)
+
+BYBIT_EXTREME = ExtremeConfig(
+    exchange='Bybit', title="🚀 EXTREME Bybit optimization (Target: <15ms)",
+    url="wss://stream.bybit.com/v5/public/spot", reader='_read_bybit',
+    connect_kwargs=AGGRESSIVE_CONNECT,
+    subscribe=b'{"op":"subscribe","args":["orderbook.1.BTCUSDT"]}',  # Pre-compiled subscription
+    recv_timeout=0.01,    # 10ms timeout
+    report_every=20
+)
+
+OKX_EXTREME = ExtremeConfig(
+    exchange='OKX', title="🚀 EXTREME OKX optimization (Target: <15ms)",
+    url="wss://ws.okx.com:8443/ws/v5/public", reader='_read_okx',
+    connect_kwargs=dict(AGGRESSIVE_CONNECT, max_msg_size=1024),  # books5 frames run ~500 bytes
+    subscribe=b'{"op":"subscribe","args":[{"channel":"books5","instId":"BTC-USDT"}]}',
+    recv_timeout=0.02,    # 20ms timeout
+    report_every=15
+)
+
+BINANCE_EXTREME = ExtremeConfig(
+    exchange='Binance', title="🚀 Binance EXTREME baseline",
+    url="wss://stream.binance.com:9443/ws/btcusdt@bookTicker", reader='_read_binance',
+    connect_kwargs=dict(autoping=False, heartbeat=None, max_msg_size=256, compress=0, decode_text=False),
+    report_every=100, avg_window=20, percentiles=False,
+    inter_arrival=True    # Spot bookTicker frames carry no event time ("E")
+)
 
 class ExtremeOptimizer:
     def __init__(self):
-        # Pre-compile regex patterns for ultra-fast parsing
-        self.bybit_price_pattern = re.compile(rb'"b":\[{2}([^"]+)","([^"]+)"[^}]*}],"a":\[{2}([^"]+)","([^"]+)"')
-        self.okx_price_pattern = re.compile(rb'"bids":\[\["([^"]+)","([^"]+)"].*?"asks":\[\["([^"]+)","([^"]+)"]')
-        
-    async def extreme_bybit_test(self, duration=15):
-        """Extreme Bybit optimization - targeting sub-20ms"""
-        print(f"🚀 EXTREME Bybit optimization (Target: <15ms) for {duration}s...")
-        
-        latencies = []
-        message_count = 0
-        url = "wss://stream.bybit.com/v5/public/spot"
-        
-        # Pre-compiled subscription
-        sub_msg = b'{"op":"subscribe","args":["orderbook.1.BTCUSDT"]}'
+        # Book pushes open with these exact prefixes; one memcmp rejects acks/heartbeats
+        self._bybit_topic_prefix = b'{"topic":"orderbook'
+        self._okx_arg_prefix = b'{"arg":{"channel":"books5"'
+        # Literal field markers for memchr-backed bytes.find() scans (no regex backtracking)
+        self._bybit_ts_marker = b'"ts":'
+        self._bybit_bid_marker = b'"b":[["'
+        self._bybit_ask_marker = b'"a":[["'
+        self._okx_ts_marker = b'"ts":"'
+        self._okx_bid_marker = b'"bids":[["'
+        self._okx_ask_marker = b'"asks":[["'
+        self._binance_event_marker = b'"E":'
+        self._binance_bid_marker = b'"b":"'
+        self._binance_ask_marker = b'"a":"'
+        if HAS_C_PARSER:
+            # Same (ts, bid, ask) contract, so the readers pick these up unchanged
+            self._parse_bybit = _extreme_parse.parse_bybit
+            self._parse_okx = _extreme_parse.parse_okx
+            self._parse_binance = _extreme_parse.parse_binance
         
+    def _parse_bybit(self, msg_bytes):
+        """(server ts ms, bid bytes, ask bytes) from a Bybit orderbook frame; None when a marker is missing"""
+        find = msg_bytes.find  # bound once: each scan calls it 5-6 times
+        t = find(self._bybit_ts_marker)
+        if t < 0:
+            return None
+        i = find(self._bybit_bid_marker, t)
+        k = find(self._bybit_ask_marker, t)
+        if i < 0 or k < 0:
+            return None
+        server_ts = int(msg_bytes[t + 5:find(b',', t + 5)])
+        bid = msg_bytes[i + 7:find(b'"', i + 7)]
+        ask = msg_bytes[k + 7:find(b'"', k + 7)]
+        return server_ts, bid, ask
+    
+    def _parse_okx(self, msg_bytes):
+        """(server ts ms, bid bytes, ask bytes) from an OKX books5 frame; None when a marker is missing"""
+        find = msg_bytes.find
+        t = find(self._okx_ts_marker)
+        i = find(self._okx_bid_marker)
+        k = find(self._okx_ask_marker)
+        if t < 0 or i < 0 or k < 0:
+            return None
+        server_ts = int(msg_bytes[t + 6:find(b'"', t + 6)])
+        bid = msg_bytes[i + 10:find(b'"', i + 10)]
+        ask = msg_bytes[k + 10:find(b'"', k + 10)]
+        return server_ts, bid, ask
+    
+    def _parse_binance(self, msg_bytes):
+        """(event time ms or None, bid bytes, ask bytes) from a Binance bookTicker frame; None when a marker is missing"""
+        find = msg_bytes.find
+        i = find(self._binance_bid_marker)
+        k = find(self._binance_ask_marker)
+        if i < 0 or k < 0:
+            return None
+        bid = msg_bytes[i + 5:find(b'"', i + 5)]
+        ask = msg_bytes[k + 5:find(b'"', k + 5)]
+        e = find(self._binance_event_marker)
+        if e < 0:
+            return None, bid, ask
+        end = find(b',', e + 4)
+        return int(msg_bytes[e + 4:end if end > 0 else find(b'}', e + 4)]), bid, ask
+    
+    def _read_bybit(self, msg_bytes, loads=parse_json):
+        """Gate, byte-scan, then JSON fallback for one Bybit frame (loads bound as a default: a local, not a global)"""
+        if not msg_bytes.startswith(self._bybit_topic_prefix):
+            return None
         try:
-            # Most aggressive settings possible
-            async with websockets.connect(
-                url,
-                ping_interval=None,
-                ping_timeout=None,
-                max_size=256,         # Tiny buffer
-                compression=None,     # No compression
-                close_timeout=0.01,   # Immediate close
-                open_timeout=3        # Fast connection
-            ) as ws:
-                await ws.send(sub_msg)
+            quote = self._parse_bybit(msg_bytes)
+        except ValueError:
+            quote = None
+        if quote:
+            return quote
+        
+        # Fallback to minimal JSON parsing if the scan fails
+        if b'"data":' in msg_bytes:
+            data = loads(msg_bytes)
+            if (data.get('topic', '').startswith('orderbook') and 
+                'data' in data and data['data']):
                 
-                start_time = time.perf_counter()
-                timeout_count = 0
+                book = data['data']
+                bids = book.get('b', [])
+                asks = book.get('a', [])
                 
-                while time.perf_counter() - start_time < duration:
-                    try:
-                        # Ultra-aggressive timing
-                        msg_start = time.perf_counter()
-                        msg = await asyncio.wait_for(ws.recv(), timeout=0.01)  # 10ms timeout
-                        recv_time = time.perf_counter()
-                        
-                        timeout_count = 0
-                        
-                        # Direct binary processing - skip JSON if possible
-                        if isinstance(msg, str):
-                            msg_bytes = msg.encode('utf-8')
-                        else:
-                            msg_bytes = msg
-                        
-                        # Try regex first (fastest)
-                        match = self.bybit_price_pattern.search(msg_bytes)
-                        if match:
-                            try:
-                                bid_price = float(match.group(1))
-                                ask_price = float(match.group(3))
-                                
-                                latency = (recv_time - msg_start) * 1000
-                                latencies.append(latency)
-                                message_count += 1
-                                
-                                if message_count % 20 == 0:
-                                    recent = latencies[-10:] if len(latencies) >= 10 else latencies
-                                    avg = sum(recent) / len(recent)
-                                    print(f"🔥 Bybit #{message_count}: {bid_price:.2f}/{ask_price:.2f} | "
-                                          f"Latency: {latency:.2f}ms | Avg10: {avg:.2f}ms")
-                                continue
-                            except (ValueError, IndexError):
-                                pass
-                        
-                        # Fallback to minimal JSON parsing if regex fails
-                        if b'"topic":"orderbook' in msg_bytes and b'"data":' in msg_bytes:
-                            try:
-                                data = parse_json(msg_bytes)
-                                if (data.get('topic', '').startswith('orderbook') and 
-                                    'data' in data and data['data']):
-                                    
-                                    book = data['data']
-                                    bids = book.get('b', [])
-                                    asks = book.get('a', [])
-                                    
-                                    if bids and asks and bids[0] and asks[0]:
-                                        bid_price = float(bids[0][0])
-                                        ask_price = float(asks[0][0])
-                                        
-                                        latency = (recv_time - msg_start) * 1000
-                                        latencies.append(latency)
-                                        message_count += 1
-                            except:
-                                continue
-                        
-                    except asyncio.TimeoutError:
-                        timeout_count += 1
-                        if timeout_count > 100:  # Too many timeouts
-                            break
-                        continue
-                    except Exception:
-                        continue
-                        
-        except Exception as e:
-            print(f"❌ Bybit connection error: {e}")
+                if bids and asks and bids[0] and asks[0]:
+                    return int(data['ts']), bids[0][0], asks[0][0]
+        return None
+    
+    def _read_okx(self, msg_bytes, loads=parse_json):
+        """Gate, byte-scan, then JSON fallback for one OKX frame"""
+        # (bids follow five ask levels, well past any fixed-size head)
+        if not msg_bytes.startswith(self._okx_arg_prefix):
             return None
+        try:
+            quote = self._parse_okx(msg_bytes)
+        except ValueError:
+            quote = None
+        if quote:
+            return quote
         
-        if latencies:
-            avg_lat = sum(latencies) / len(latencies)
-            min_lat = min(latencies)
-            max_lat = max(latencies)
-            msg_rate = message_count / duration
-            
-            # Percentile analysis
-            sorted_lat = sorted(latencies)
-            p50 = sorted_lat[len(sorted_lat)//2]
-            p90 = sorted_lat[int(len(sorted_lat)*0.9)]
-            p95 = sorted_lat[int(len(sorted_lat)*0.95)]
-            
-            under_15ms = len([l for l in latencies if l < 15])
-            under_20ms = len([l for l in latencies if l < 20])
-            
-            print(f"✅ EXTREME Bybit Results:")
-            print(f"   📈 Speed: {msg_rate:.1f} msg/s")
-            print(f"   ⚡ Avg: {avg_lat:.2f}ms | Min: {min_lat:.2f}ms | Max: {max_lat:.2f}ms")
-            print(f"   📊 P50: {p50:.2f}ms | P90: {p90:.2f}ms | P95: {p95:.2f}ms")
-            print(f"   🎯 <15ms: {under_15ms}/{len(latencies)} ({under_15ms/len(latencies)*100:.1f}%)")
-            print(f"   ✅ <20ms: {under_20ms}/{len(latencies)} ({under_20ms/len(latencies)*100:.1f}%)")
-            
-            target_15 = "✅ ACHIEVED!" if avg_lat < 15 else "⚠️ CLOSE" if avg_lat < 20 else "❌ FAILED"
-            target_20 = "✅ ACHIEVED!" if avg_lat < 20 else "⚠️ CLOSE" if avg_lat < 25 else "❌ FAILED"
-            print(f"   🎯 Target <15ms: {target_15}")
-            print(f"   🎯 Target <20ms: {target_20}")
-            
-            return {
-                'exchange': 'Bybit',
-                'method': 'EXTREME',
-                'avg_latency': avg_lat,
-                'min_latency': min_lat,
-                'p50_latency': p50,
-                'p95_latency': p95,
-                'msg_per_sec': msg_rate,
-                'under_15ms_pct': under_15ms/len(latencies)*100,
-                'under_20ms_pct': under_20ms/len(latencies)*100,
-                'total_messages': message_count
-            }
+        # Fallback to minimal JSON parsing
+        if b'"data":[' in msg_bytes:
+            data = loads(msg_bytes)
+            if ('data' in data and data['data'] and len(data['data']) > 0):
+                book = data['data'][0]
+                bids = book.get('bids', [])
+                asks = book.get('asks', [])
+                
+                if bids and asks and len(bids) > 0 and len(asks) > 0:
+                    return int(book['ts']), bids[0][0], asks[0][0]
         return None
     
-    async def extreme_okx_test(self, duration=15):
-        """Extreme OKX optimization - targeting sub-20ms"""
-        print(f"🚀 EXTREME OKX optimization (Target: <15ms) for {duration}s...")
+    def _read_binance(self, msg_bytes, loads=parse_json):
+        """Byte-scan, then JSON fallback for one Binance frame"""
+        try:
+            quote = self._parse_binance(msg_bytes)
+        except ValueError:
+            quote = None
+        if quote:
+            return quote
         
-        latencies = []
-        message_count = 0
-        url = "wss://ws.okx.com:8443/ws/v5/public"
+        # Fallback to JSON
+        data = loads(msg_bytes)
+        if 'b' in data and 'a' in data:
+            return data.get('E'), data['b'], data['a']
+        return None
+    
+    async def _run_extreme(self, cfg, duration=15):
+        """
+        Run one extreme latency test described by an ExtremeConfig
+        Latency is measured against the frame's server timestamp; inter_arrival configs
+        record the gap since the previous frame instead, and their results say so
+        """
+        print(f"{cfg.title} for {duration}s...")
         
-        # Pre-compiled subscription
-        sub_msg = b'{"op":"subscribe","args":[{"channel":"books5","instId":"BTC-USDT"}]}'
+        stats = LatencyDigest()
+        pending = []
+        # Rolling average window with a running sum: O(1) per sample, no slice copies
+        avg_window = cfg.avg_window
+        recent = deque(maxlen=avg_window)
+        recent_sum = 0.0
+        message_count = 0
         
         try:
-            # Most aggressive settings possible
-            async with websockets.connect(
-                url,
-                ping_interval=None,
-                ping_timeout=None,
-                max_size=256,         # Tiny buffer
-                compression=None,     # No compression
-                close_timeout=0.01,   # Immediate close
-                open_timeout=3        # Fast connection
-            ) as ws:
-                await ws.send(sub_msg)
+            async with aiohttp.ClientSession(timeout=CONNECT_TIMEOUT) as session, \
+                    session.ws_connect(cfg.url, **cfg.connect_kwargs) as ws:
+                if cfg.subscribe:
+                    await ws.send_frame(cfg.subscribe, aiohttp.WSMsgType.TEXT)
+                
+                # Hot-loop names bound once: LOAD_FAST instead of global/attribute lookups
+                perf_counter = time.perf_counter
+                now = time.time
+                receive = ws.receive
+                closed_types = WS_CLOSED_TYPES
+                timeout = _timeout
+                recv_timeout = cfg.recv_timeout
+                read = getattr(self, cfg.reader)
+                append = pending.append
+                digest_chunk = DIGEST_CHUNK
+                recent_append = recent.append
+                report_every = cfg.report_every
+                inter_arrival = cfg.inter_arrival
+                metric_label = "Gap" if inter_arrival else "Latency"
                 
-                start_time = time.perf_counter()
+                start_time = perf_counter()
+                prev_recv_ms = now() * 1000
                 timeout_count = 0
                 
-                while time.perf_counter() - start_time < duration:
+                while perf_counter() - start_time < duration:
+                    # Only the await can time out; the try frame covers nothing else
                     try:
                         # Ultra-aggressive timing
-                        msg_start = time.perf_counter()
-                        msg = await asyncio.wait_for(ws.recv(), timeout=0.02)  # 20ms timeout
-                        recv_time = time.perf_counter()
-                        
-                        timeout_count = 0
-                        
-                        # Direct binary processing
-                        if isinstance(msg, str):
-                            msg_bytes = msg.encode('utf-8')
-                        else:
-                            msg_bytes = msg
-                        
-                        # Try regex first (fastest)
-                        match = self.okx_price_pattern.search(msg_bytes)
-                        if match:
-                            try:
-                                bid_price = float(match.group(1))
-                                ask_price = float(match.group(3))
-                                
-                                latency = (recv_time - msg_start) * 1000
-                                latencies.append(latency)
-                                message_count += 1
-                                
-                                if message_count % 15 == 0:
-                                    recent = latencies[-10:] if len(latencies) >= 10 else latencies
-                                    avg = sum(recent) / len(recent)
-                                    print(f"🔥 OKX #{message_count}: {bid_price:.2f}/{ask_price:.2f} | "
-                                          f"Latency: {latency:.2f}ms | Avg10: {avg:.2f}ms")
-                                continue
-                            except (ValueError, IndexError):
-                                pass
-                        
-                        # Fallback to minimal JSON parsing
-                        if b'"channel":"books5"' in msg_bytes and b'"data":[' in msg_bytes:
-                            try:
-                                data = parse_json(msg_bytes)
-                                if ('data' in data and data['data'] and len(data['data']) > 0):
-                                    book = data['data'][0]
-                                    bids = book.get('bids', [])
-                                    asks = book.get('asks', [])
-                                    
-                                    if bids and asks and len(bids) > 0 and len(asks) > 0:
-                                        bid_price = float(bids[0][0])
-                                        ask_price = float(asks[0][0])
-                                        
-                                        latency = (recv_time - msg_start) * 1000
-                                        latencies.append(latency)
-                                        message_count += 1
-                            except:
-                                continue
-                        
+                        async with timeout(recv_timeout):
+                            frame = await receive()
                     except asyncio.TimeoutError:
                         timeout_count += 1
                         if timeout_count > 100:  # Too many timeouts
-                            print(f"⚠️ Too many timeouts ({timeout_count}), OKX may be slow")
+                            print(f"⚠️ Too many timeouts ({timeout_count}), {cfg.exchange} may be slow")
                             break
                         continue
-                    except Exception:
+                    # One clock read per message; latency is measured against the server timestamp
+                    recv_ms = now() * 1000
+                    
+                    timeout_count = 0
+                    if frame.type in closed_types:
+                        break
+                    
+                    # Direct binary processing: raw frame bytes, never decoded to str
+                    try:
+                        quote = read(frame.data)
+                    except PARSE_ERRORS:
+                        continue
+                    if quote is None:
                         continue
+                    server_ts, bid, ask = quote
+                    
+                    if inter_arrival:
+                        latency = recv_ms - prev_recv_ms
+                        prev_recv_ms = recv_ms
+                    elif server_ts is None:
+                        continue  # No server clock to measure this frame against
+                    else:
+                        latency = recv_ms - server_ts
+                    if len(recent) == avg_window:
+                        recent_sum -= recent[0]
+                    recent_append(latency)
+                    recent_sum += latency
+                    append(latency)
+                    if len(pending) == digest_chunk:
+                        stats.extend(pending)
+                        pending.clear()
+                    message_count += 1
+                    
+                    if message_count % report_every == 0:
+                        avg = recent_sum / len(recent)
+                        # Prices stay raw until a log line actually needs them
+                        print(f"🔥 {cfg.exchange} #{message_count}: "
+                              f"{_format_ticks(_to_ticks(bid))}/{_format_ticks(_to_ticks(ask))} | "
+                              f"{metric_label}: {latency:.2f}ms | Avg{avg_window}: {avg:.2f}ms")
                         
-        except Exception as e:
-            print(f"❌ OKX connection error: {e}")
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            print(f"❌ {cfg.exchange} connection error: {e}")
             return None
         
-        if latencies:
-            avg_lat = sum(latencies) / len(latencies)
-            min_lat = min(latencies)
-            max_lat = max(latencies)
-            msg_rate = message_count / duration
-            
-            # Percentile analysis
-            sorted_lat = sorted(latencies)
-            p50 = sorted_lat[len(sorted_lat)//2]
-            p90 = sorted_lat[int(len(sorted_lat)*0.9)]
-            p95 = sorted_lat[int(len(sorted_lat)*0.95)]
-            
-            under_15ms = len([l for l in latencies if l < 15])
-            under_20ms = len([l for l in latencies if l < 20])
-            
-            print(f"✅ EXTREME OKX Results:")
+        stats.extend(pending)
+        if not stats.count:
+            return None
+        
+        avg_lat = stats.mean()
+        min_lat = stats.min
+        msg_rate = message_count / duration
+        under_20ms = stats.under_20ms
+        
+        metric = 'inter-arrival' if cfg.inter_arrival else 'latency'
+        if not cfg.percentiles:
+            print(f"✅ {cfg.exchange} EXTREME Results:")
             print(f"   📈 Speed: {msg_rate:.1f} msg/s")
-            print(f"   ⚡ Avg: {avg_lat:.2f}ms | Min: {min_lat:.2f}ms | Max: {max_lat:.2f}ms")
-            print(f"   📊 P50: {p50:.2f}ms | P90: {p90:.2f}ms | P95: {p95:.2f}ms")
-            print(f"   🎯 <15ms: {under_15ms}/{len(latencies)} ({under_15ms/len(latencies)*100:.1f}%)")
-            print(f"   ✅ <20ms: {under_20ms}/{len(latencies)} ({under_20ms/len(latencies)*100:.1f}%)")
-            
-            target_15 = "✅ ACHIEVED!" if avg_lat < 15 else "⚠️ CLOSE" if avg_lat < 20 else "❌ FAILED"
-            target_20 = "✅ ACHIEVED!" if avg_lat < 20 else "⚠️ CLOSE" if avg_lat < 25 else "❌ FAILED"
-            print(f"   🎯 Target <15ms: {target_15}")
-            print(f"   🎯 Target <20ms: {target_20}")
+            print(f"   ⚡ Avg {metric}: {avg_lat:.2f}ms | Min: {min_lat:.2f}ms")
+            print(f"   ✅ Under 20ms: {under_20ms}/{stats.count} ({under_20ms/stats.count*100:.1f}%)")
             
             return {
-                'exchange': 'OKX',
+                'exchange': cfg.exchange,
                 'method': 'EXTREME',
+                'metric': metric,
                 'avg_latency': avg_lat,
                 'min_latency': min_lat,
-                'p50_latency': p50,
-                'p95_latency': p95,
                 'msg_per_sec': msg_rate,
-                'under_15ms_pct': under_15ms/len(latencies)*100,
-                'under_20ms_pct': under_20ms/len(latencies)*100,
+                'under_20ms_pct': under_20ms/stats.count*100,
                 'total_messages': message_count
             }
-        return None
-    
-    async def binance_baseline_extreme(self, duration=15):
-        """Binance with extreme optimizations for comparison"""
-        print(f"🚀 Binance EXTREME baseline for {duration}s...")
         
-        latencies = []
-        message_count = 0
-        url = "wss://stream.binance.com:9443/ws/btcusdt@bookTicker"
+        max_lat = stats.max
         
-        # Pre-compile regex for Binance
-        price_pattern = re.compile(rb'"b":"([^"]+)".*?"a":"([^"]+)"')
+        # Percentile analysis
+        p50, p90, p95 = stats.percentiles([0.5, 0.9, 0.95])
         
-        try:
-            async with websockets.connect(
-                url,
-                ping_interval=None,
-                max_size=256,
-                compression=None
-            ) as ws:
-                start_time = time.perf_counter()
-                
-                while time.perf_counter() - start_time < duration:
-                    try:
-                        msg_start = time.perf_counter()
-                        msg = await ws.recv()
-                        recv_time = time.perf_counter()
-                        
-                        # Direct binary processing
-                        if isinstance(msg, str):
-                            msg_bytes = msg.encode('utf-8')
-                        else:
-                            msg_bytes = msg
-                        
-                        # Regex first
-                        match = price_pattern.search(msg_bytes)
-                        if match:
-                            try:
-                                bid = float(match.group(1))
-                                ask = float(match.group(2))
-                                
-                                latency = (recv_time - msg_start) * 1000
-                                latencies.append(latency)
-                                message_count += 1
-                                
-                                if message_count % 100 == 0:
-                                    recent = latencies[-20:] if len(latencies) >= 20 else latencies
-                                    avg = sum(recent) / len(recent)
-                                    print(f"🔥 Binance #{message_count}: {bid:.2f}/{ask:.2f} | "
-                                          f"Latency: {latency:.2f}ms | Avg20: {avg:.2f}ms")
-                                continue
-                            except ValueError:
-                                pass
-                        
-                        # Fallback to JSON
-                        try:
-                            data = parse_json(msg_bytes)
-                            if 'b' in data and 'a' in data:
-                                bid = float(data['b'])
-                                ask = float(data['a'])
-                                latency = (recv_time - msg_start) * 1000
-                                latencies.append(latency)
-                                message_count += 1
-                        except:
-                            continue
-                        
-                    except Exception:
-                        continue
-                        
-        except Exception as e:
-            print(f"❌ Binance connection error: {e}")
-            return None
+        under_15ms = stats.under_15ms
         
-        if latencies:
-            avg_lat = sum(latencies) / len(latencies)
-            min_lat = min(latencies)
-            msg_rate = message_count / duration
-            under_20ms = len([l for l in latencies if l < 20])
-            
-            print(f"✅ Binance EXTREME Results:")
-            print(f"   📈 Speed: {msg_rate:.1f} msg/s")
-            print(f"   ⚡ Avg: {avg_lat:.2f}ms | Min: {min_lat:.2f}ms")
-            print(f"   ✅ Under 20ms: {under_20ms}/{len(latencies)} ({under_20ms/len(latencies)*100:.1f}%)")
-            
-            return {
-                'exchange': 'Binance',
-                'method': 'EXTREME',
-                'avg_latency': avg_lat,
-                'min_latency': min_lat,
-                'msg_per_sec': msg_rate,
-                'under_20ms_pct': under_20ms/len(latencies)*100,
-                'total_messages': message_count
-            }
-        return None
+        print(f"✅ EXTREME {cfg.exchange} Results:")
+        print(f"   📈 Speed: {msg_rate:.1f} msg/s")
+        print(f"   ⚡ Avg: {avg_lat:.2f}ms | Min: {min_lat:.2f}ms | Max: {max_lat:.2f}ms")
+        print(f"   📊 P50: {p50:.2f}ms | P90: {p90:.2f}ms | P95: {p95:.2f}ms")
+        print(f"   🎯 <15ms: {under_15ms}/{stats.count} ({under_15ms/stats.count*100:.1f}%)")
+        print(f"   ✅ <20ms: {under_20ms}/{stats.count} ({under_20ms/stats.count*100:.1f}%)")
+        
+        target_15 = "✅ ACHIEVED!" if avg_lat < 15 else "⚠️ CLOSE" if avg_lat < 20 else "❌ FAILED"
+        target_20 = "✅ ACHIEVED!" if avg_lat < 20 else "⚠️ CLOSE" if avg_lat < 25 else "❌ FAILED"
+        print(f"   🎯 Target <15ms: {target_15}")
+        print(f"   🎯 Target <20ms: {target_20}")
+        
+        return {
+            'exchange': cfg.exchange,
+            'method': 'EXTREME',
+            'metric': metric,
+            'avg_latency': avg_lat,
+            'min_latency': min_lat,
+            'p50_latency': p50,
+            'p95_latency': p95,
+            'msg_per_sec': msg_rate,
+            'under_15ms_pct': under_15ms/stats.count*100,
+            'under_20ms_pct': under_20ms/stats.count*100,
+            'total_messages': message_count
+        }
+    
+    async def extreme_bybit_test(self, duration=15):
+        """Extreme Bybit optimization - targeting sub-20ms"""
+        return await self._run_extreme(BYBIT_EXTREME, duration)
+    
+    async def extreme_okx_test(self, duration=15):
+        """Extreme OKX optimization - targeting sub-20ms"""
+        return await self._run_extreme(OKX_EXTREME, duration)
+    
+    async def binance_baseline_extreme(self, duration=15):
+        """Binance with extreme optimizations for comparison"""
+        return await self._run_extreme(BINANCE_EXTREME, duration)
 
 async def main():
     """Run extreme optimization tests"""
@@ -406,7 +494,7 @@ async def main():
     print("🚀 EXTREME LATENCY OPTIMIZER")
     print("=" * 60)
     print("🎯 MISSION: Get Bybit & OKX under 15-20ms using EXTREME techniques")
-    print("🔥 Using regex parsing, binary processing, ultra-small buffers")
+    print("🔥 Using byte-scan parsing, binary processing, ultra-small buffers")
     print()
     
     test_duration = 20  # Longer test for better accuracy
@@ -418,24 +506,47 @@ async def main():
         ("OKX EXTREME", optimizer.extreme_okx_test),
     ]
     
-    for test_name, test_func in tests:
-        print(f"\n{'='*60}")
-        print(f"🚀 Running {test_name}...")
-        print('='*60)
-        try:
-            result = await test_func(test_duration)
-            if result:
-                results.append(result)
-        except Exception as e:
-            print(f"❌ {test_name} failed: {e}")
-        
-        await asyncio.sleep(2)
+    print(f"\n{'='*60}")
+    print(f"🚀 Running {', '.join(name for name, _ in tests)} concurrently...")
+    print('='*60)
+    
+    # Each test owns its own connection and local state, so they share one event loop:
+    # the suite takes ~one test duration, and no exchange is favoured by running first
+    # No collector pauses inside the measurement window: startup objects go to the
+    # permanent generation, and the cyclic GC stays off until every test has finished
+    gc.collect()
+    gc.freeze()
+    gc.disable()
+    try:
+        outcomes = await asyncio.gather(
+            *(test_func(test_duration) for _, test_func in tests),
+            return_exceptions=True
+        )
+    finally:
+        gc.enable()
+        gc.unfreeze()
+        gc.collect()
+    
+    for (test_name, _), result in zip(tests, outcomes):
+        if isinstance(result, Exception):
+            print(f"❌ {test_name} failed: {result}")
+        elif result:
+            results.append(result)
     
     # Final results
     print(f"\n{'='*60}")
     print("🏆 EXTREME OPTIMIZATION FINAL RESULTS")
     print('='*60)
     
+    # Inter-arrival gaps are not latencies, so they are listed apart and never ranked
+    references = [r for r in results if r['metric'] == 'inter-arrival']
+    results = [r for r in results if r['metric'] == 'latency']
+    for result in references:
+        print(f"📎 {result['exchange']} {result['method']} (reference, no server timestamp)")
+        print(f"    ⏱️ Avg inter-arrival gap: {result['avg_latency']:.2f}ms")
+        print(f"    📈 Speed: {result['msg_per_sec']:.1f} msg/s")
+        print()
+    
     if results:
         results.sort(key=lambda x: x['avg_latency'])
         
@@ -472,6 +583,8 @@ async def main():
         print("❌ No successful tests")
 
 if __name__ == "__main__":
+    if HAS_UVLOOP:
+        uvloop.install()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -7,79 +7,277 @@ Optimized for maximum speed with zero monthly costs
 
 import asyncio
 import time
-import json
-import websockets
+import aiohttp
 import logging
 from collections import deque
 from datetime import datetime
+import numpy as np
+from array import array
 
 # Minimal logging for maximum speed
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
+# orjson is required: fail fast at startup rather than silently parsing with stdlib json
+import orjson
+fast_json_dumps = orjson.dumps
+print("🔥 Using orjson (FASTEST)")
+
+try:
+    import simdjson
+    HAS_SIMDJSON = True
+    # One reusable parser shared by the three feeds: its internal buffers are allocated once
+    # and kept across frames (safe on one event loop, the *_top_of_book helpers never await)
+    _json_parser = simdjson.Parser()
+    print("🔥 Using simdjson on-demand parsing for prices")
+except ImportError:
+    HAS_SIMDJSON = False
+    print("⚠️ Install pysimdjson for faster price parsing: pip install pysimdjson")
+
+try:
+    import uvloop
+    HAS_UVLOOP = True
+    print("⚡ Using uvloop event loop")
+except ImportError:
+    HAS_UVLOOP = False
+    print("⚠️ Install uvloop for a faster event loop: pip install uvloop")
+
 try:
-    import orjson
-    HAS_ORJSON = True
-    fast_json_loads = orjson.loads
-    fast_json_dumps = orjson.dumps
-    print("🔥 Using orjson (FASTEST)")
+    # Drop-in float(): same results and ValueError on bad input, faster C string parsing
+    from fastnumbers import float as fast_float
+    HAS_FASTNUMBERS = True
+    print("🔥 Using fastnumbers price conversion")
 except ImportError:
-    HAS_ORJSON = False
-    fast_json_loads = json.loads
-    fast_json_dumps = json.dumps
-    print("⚠️ Install orjson for 30% speed boost: pip install orjson")
+    fast_float = float
+    HAS_FASTNUMBERS = False
+    print("⚠️ Install fastnumbers for faster price conversion: pip install fastnumbers")
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+    print("🚀 Using numba JIT arbitrage kernel")
+except ImportError:
+    HAS_NUMBA = False
+    print("⚠️ Install numba for a compiled arbitrage kernel: pip install numba")
+
+    def njit(*args, **kwargs):
+        """Stand-in decorator so the kernel runs as plain Python without numba"""
+        def wrap(fn):
+            return fn
+        return wrap
+
+# *_top_of_book(msg) -> (best bid, best ask) price strings; LookupError when the frame lacks them
+# Prices arrive as JSON strings, so there is no typed double to read; simdjson still skips
+# building the Python dict for every field the monitor never looks at
+if HAS_SIMDJSON:
+    # The document must not outlive each call: the parser refuses to re-parse
+    # while proxies into its previous document are still referenced
+    def binance_top_of_book(msg, _parse=_json_parser.parse):
+        """Binance bookTicker frame, without materializing the document"""
+        doc = _parse(msg)
+        return doc['b'], doc['a']
+    
+    def coinbase_top_of_book(msg, _parse=_json_parser.parse):
+        """Coinbase ticker frame, without materializing the document"""
+        doc = _parse(msg)
+        return doc['best_bid'], doc['best_ask']
+    
+    def bybit_top_of_book(msg, _parse=_json_parser.parse):
+        """Bybit orderbook frame, without materializing the document"""
+        doc = _parse(msg)
+        return doc.at_pointer('/data/b/0/0'), doc.at_pointer('/data/a/0/0')
+else:
+    def binance_top_of_book(msg, _loads=orjson.loads):
+        """Binance bookTicker frame"""
+        data = _loads(msg)
+        return data['b'], data['a']
+    
+    def coinbase_top_of_book(msg, _loads=orjson.loads):
+        """Coinbase ticker frame"""
+        data = _loads(msg)
+        return data['best_bid'], data['best_ask']
+    
+    def bybit_top_of_book(msg, _loads=orjson.loads):
+        """Bybit orderbook frame"""
+        book = _loads(msg)['data']
+        return book['b'][0][0], book['a'][0][0]
+
+# aiohttp ws_connect() options shared by the three feeds: no permessage-deflate,
+# and text frames handed over as raw bytes (orjson/simdjson parse bytes directly).
+# decode_text=False also skips aiohttp's UTF-8 validation of text frames - the JSON
+# parsers validate anyway - and its receive queue is already bounded (reading pauses
+# at a fixed buffered-bytes limit), so there is no max_queue/read_limit to tune here
+WS_CONNECT = dict(compress=0, decode_text=False)
+# Frame types that end a receive loop (connection gone)
+WS_CLOSED_TYPES = (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR)
+
+async def _receive_latest(ws, timeout):
+    """
+    Await the next frame, then drain every frame aiohttp has already buffered, keeping the newest
+    All three feeds push top-of-book snapshots, so a burst coalesces into a single parse, and
+    receive() completes without yielding to the event loop while frames are queued
+    """
+    receive = ws.receive
+    frame = await receive(timeout=timeout)
+    # aiohttp exposes no public "frames pending" check; if its private reader buffer ever
+    # moves, degrade to one frame per await instead of failing every feed
+    buffered = getattr(getattr(ws, '_reader', None), '_buffer', None)
+    while buffered and frame.type not in WS_CLOSED_TYPES:
+        frame = await receive()
+    return frame
+
+# Frames that don't carry a usable quote are skipped; JSONDecodeError/simdjson errors subclass ValueError
+PARSE_ERRORS = (LookupError, ValueError, TypeError)
+
+# Per-feed latency is measured on one frame in 16 (received & mask == 0)
+LATENCY_SAMPLE_MASK = 15
+
+# Venue order: row index in the quote table
+EXCHANGES = ('binance', 'coinbase', 'bybit')
+# Quote table columns (slot offsets within an exchange's block of QUOTE_FIELDS)
+BID, ASK, TIME, LATENCY = range(4)
+QUOTE_FIELDS = 4
+
+def _quote_slots(exchange):
+    """(bid, ask, time, latency) indices of an exchange's slots in the flat quote array"""
+    base = EXCHANGES.index(exchange) * QUOTE_FIELDS
+    return base + BID, base + ASK, base + TIME, base + LATENCY
+
+# Only show opportunities with meaningful profit (0.01% or higher)
+MIN_PROFIT_PERCENT = 0.01
+# Opportunities whose profit feeds the summary averages / full records kept for status output
+OPPORTUNITY_HISTORY = 100
+RECENT_OPPORTUNITIES = 5
+# Opportunities waiting for print_opportunities; beyond this, lines are dropped
+PRINT_QUEUE_SIZE = 1024
+
+@njit(cache=True)
+def _find_arb(quotes, now, threshold):
+    """
+    Best bid/ask across exchanges with recent data (within 1 second); ties keep the earlier row
+    Returns (bid row, ask row, profit USD, profit %), rows are -1 unless at least two exchanges
+    are fresh and buying on one and selling on another clears threshold percent
+    """
+    active = 0
+    bid_ex = -1
+    ask_ex = -1
+    best_bid = -np.inf
+    best_ask = np.inf
+    for i in range(quotes.shape[0]):
+        t = quotes[i, TIME]
+        if t > 0.0 and (now - t) < 1.0:
+            active += 1
+            if quotes[i, BID] > best_bid:
+                best_bid = quotes[i, BID]
+                bid_ex = i
+            if quotes[i, ASK] < best_ask:
+                best_ask = quotes[i, ASK]
+                ask_ex = i
+    
+    if active < 2 or bid_ex == ask_ex or best_bid <= best_ask:
+        return -1, -1, 0.0, 0.0
+    profit_usd = best_bid - best_ask
+    profit_percent = (profit_usd / best_ask) * 100.0
+    if profit_percent <= threshold:
+        return -1, -1, 0.0, 0.0
+    return bid_ex, ask_ex, profit_usd, profit_percent
+
+class Opportunity:
+    """One detected arbitrage opportunity: buy on the best-ask exchange, sell on the best-bid one"""
+    __slots__ = ('number', 'time', 'buy_exchange', 'sell_exchange', 'buy_price', 'sell_price',
+                 'profit_usd', 'profit_percent', 'latency_buy', 'latency_sell')
+    
+    def __init__(self, number, time, buy_exchange, sell_exchange, buy_price, sell_price,
+                 profit_usd, profit_percent, latency_buy, latency_sell):
+        self.number = number
+        self.time = time
+        self.buy_exchange = buy_exchange
+        self.sell_exchange = sell_exchange
+        self.buy_price = buy_price
+        self.sell_price = sell_price
+        self.profit_usd = profit_usd
+        self.profit_percent = profit_percent
+        self.latency_buy = latency_buy
+        self.latency_sell = latency_sell
 
 class FreeArbitrageMonitor:
     def __init__(self):
-        self.prices = {
-            'binance': {'bid': 0, 'ask': 0, 'time': 0, 'latency': 0},
-            'coinbase': {'bid': 0, 'ask': 0, 'time': 0, 'latency': 0},
-            'bybit': {'bid': 0, 'ask': 0, 'time': 0, 'latency': 0}
-        }
-        self.arbitrage_opportunities = deque(maxlen=100)
+        # Latest quote per exchange: flat float64 slots, QUOTE_FIELDS per exchange in EXCHANGES
+        # order (BID/ASK/TIME/LATENCY). The monitors store into the array.array directly (cheaper
+        # than NumPy item assignment); quotes is a zero-copy (3, 4) view of the same memory
+        # that the compiled _find_arb reads
+        self.px = array('d', [0.0] * (len(EXCHANGES) * QUOTE_FIELDS))
+        self.quotes = np.frombuffer(self.px, dtype=np.float64).reshape(len(EXCHANGES), QUOTE_FIELDS)
+        # Compile (or load from numba's on-disk cache) before the first tick arrives
+        _find_arb(self.quotes, 0.0, MIN_PROFIT_PERCENT)
+        # Profit % of the last OPPORTUNITY_HISTORY opportunities (ring buffer indexed by count);
+        # full records are only kept for the few most recent ones
+        self._profits = np.zeros(OPPORTUNITY_HISTORY, dtype=np.float64)
+        self.arbitrage_opportunities = deque(maxlen=RECENT_OPPORTUNITIES)
         self.total_opportunities = 0
+        self._print_queue = asyncio.Queue(maxsize=PRINT_QUEUE_SIZE)
+        # perf_counter() -> local wall-clock seconds, so opportunity timestamps come from the
+        # clock reading the monitors already took (fixed at startup; DST changes aren't followed)
+        self._local_clock_offset = time.time() - time.perf_counter() + time.localtime().tm_gmtoff
         
-    async def monitor_binance(self):
+    async def monitor_binance(self, _top_of_book=binance_top_of_book):
         """Monitor Binance (FASTEST - 0.04ms average)"""
         while True:
             try:
                 url = "wss://stream.binance.com:9443/ws/btcusdt@bookTicker"
-                async with websockets.connect(
-                    url,
-                    ping_interval=None,
-                    compression=None,
-                    max_size=512
-                ) as ws:
+                async with aiohttp.ClientSession() as session, \
+                        session.ws_connect(url, max_msg_size=512, **WS_CONNECT) as ws:
                     print("🥇 Binance connected - FASTEST")
                     
+                    # Hot-loop names bound once: LOAD_FAST instead of global/attribute lookups
+                    clock = time.perf_counter
+                    receive_latest = _receive_latest
+                    timeout_error = asyncio.TimeoutError
+                    closed_types = WS_CLOSED_TYPES
+                    parse_errors = PARSE_ERRORS
+                    sample_mask = LATENCY_SAMPLE_MASK
+                    to_float = fast_float
+                    check = self.check_arbitrage
+                    px = self.px
+                    bid_slot, ask_slot, time_slot, latency_slot = _quote_slots('binance')
+                    received = 0
+                    
                     while True:
+                        # Latency is sampled on every 16th frame; other ticks keep the last sample
+                        sampled = not (received & sample_mask)
+                        if sampled:
+                            start_time = clock()
                         try:
-                            start_time = time.perf_counter()
-                            msg = await asyncio.wait_for(ws.recv(), timeout=1.0)
-                            
-                            data = fast_json_loads(msg)
-                            if 'b' in data and 'a' in data:
-                                latency = (time.perf_counter() - start_time) * 1000
-                                
-                                self.prices['binance'] = {
-                                    'bid': float(data['b']),
-                                    'ask': float(data['a']),
-                                    'time': time.perf_counter(),
-                                    'latency': latency
-                                }
-                                
-                                self.check_arbitrage('binance')
-                        except asyncio.TimeoutError:
+                            frame = await receive_latest(ws, 1.0)
+                        except timeout_error:
                             continue
-                        except Exception as e:
-                            print(f"Binance error: {e}")
+                        received += 1
+                        if frame.type in closed_types:
                             break
+                        msg = frame.data
+                        
+                        try:
+                            bid, ask = _top_of_book(msg)
+                            bid = to_float(bid)
+                            ask = to_float(ask)
+                        except parse_errors:
+                            continue
+                        
+                        now = clock()
+                        if sampled:
+                            px[latency_slot] = (now - start_time) * 1000
+                        
+                        px[bid_slot] = bid
+                        px[ask_slot] = ask
+                        px[time_slot] = now
+                        
+                        check('binance', now)
                             
             except Exception as e:
                 print(f"Binance connection failed: {e}")
                 await asyncio.sleep(1)
 
-    async def monitor_coinbase(self):
+    async def monitor_coinbase(self, _top_of_book=coinbase_top_of_book):
         """Monitor Coinbase Pro (RELIABLE - 0.08ms average)"""
         while True:
             try:
@@ -90,43 +288,61 @@ class FreeArbitrageMonitor:
                     "channels": ["ticker"]
                 })
                 
-                async with websockets.connect(
-                    url,
-                    ping_interval=None,
-                    compression=None,
-                    max_size=1024
-                ) as ws:
-                    await ws.send(subscribe_msg)
+                async with aiohttp.ClientSession() as session, \
+                        session.ws_connect(url, max_msg_size=1024, **WS_CONNECT) as ws:
+                    await ws.send_frame(subscribe_msg, aiohttp.WSMsgType.TEXT)
                     print("🥈 Coinbase Pro connected - RELIABLE")
                     
+                    # Hot-loop names bound once: LOAD_FAST instead of global/attribute lookups
+                    clock = time.perf_counter
+                    receive_latest = _receive_latest
+                    timeout_error = asyncio.TimeoutError
+                    closed_types = WS_CLOSED_TYPES
+                    parse_errors = PARSE_ERRORS
+                    sample_mask = LATENCY_SAMPLE_MASK
+                    to_float = fast_float
+                    check = self.check_arbitrage
+                    px = self.px
+                    bid_slot, ask_slot, time_slot, latency_slot = _quote_slots('coinbase')
+                    received = 0
+                    
                     while True:
+                        sampled = not (received & sample_mask)
+                        if sampled:
+                            start_time = clock()
                         try:
-                            start_time = time.perf_counter()
-                            msg = await asyncio.wait_for(ws.recv(), timeout=1.0)
-                            
-                            data = fast_json_loads(msg)
-                            if data.get('type') == 'ticker' and 'best_bid' in data:
-                                latency = (time.perf_counter() - start_time) * 1000
-                                
-                                self.prices['coinbase'] = {
-                                    'bid': float(data['best_bid']),
-                                    'ask': float(data['best_ask']),
-                                    'time': time.perf_counter(),
-                                    'latency': latency
-                                }
-                                
-                                self.check_arbitrage('coinbase')
-                        except asyncio.TimeoutError:
+                            frame = await receive_latest(ws, 1.0)
+                        except timeout_error:
                             continue
-                        except Exception as e:
-                            print(f"Coinbase error: {e}")
+                        received += 1
+                        if frame.type in closed_types:
                             break
+                        msg = frame.data
+                        
+                        # Quick binary check before JSON parsing (skips subscription acks/heartbeats)
+                        if b'"type":"ticker"' in msg:
+                            try:
+                                bid, ask = _top_of_book(msg)
+                                bid = to_float(bid)
+                                ask = to_float(ask)
+                            except parse_errors:
+                                continue
+                            
+                            now = clock()
+                            if sampled:
+                                px[latency_slot] = (now - start_time) * 1000
+                            
+                            px[bid_slot] = bid
+                            px[ask_slot] = ask
+                            px[time_slot] = now
+                            
+                            check('coinbase', now)
                             
             except Exception as e:
                 print(f"Coinbase connection failed: {e}")
                 await asyncio.sleep(1)
 
-    async def monitor_bybit(self):
+    async def monitor_bybit(self, _top_of_book=bybit_top_of_book):
         """Monitor Bybit (BACKUP - 0.10ms average)"""
         while True:
             try:
@@ -136,101 +352,120 @@ class FreeArbitrageMonitor:
                     "args": ["orderbook.1.BTCUSDT"]
                 })
                 
-                async with websockets.connect(
-                    url,
-                    ping_interval=None,
-                    compression=None,
-                    max_size=1024
-                ) as ws:
-                    await ws.send(subscribe_msg)
+                async with aiohttp.ClientSession() as session, \
+                        session.ws_connect(url, max_msg_size=1024, **WS_CONNECT) as ws:
+                    await ws.send_frame(subscribe_msg, aiohttp.WSMsgType.TEXT)
                     print("🥉 Bybit connected - BACKUP")
                     
+                    # Hot-loop names bound once: LOAD_FAST instead of global/attribute lookups
+                    clock = time.perf_counter
+                    receive_latest = _receive_latest
+                    timeout_error = asyncio.TimeoutError
+                    closed_types = WS_CLOSED_TYPES
+                    parse_errors = PARSE_ERRORS
+                    sample_mask = LATENCY_SAMPLE_MASK
+                    to_float = fast_float
+                    check = self.check_arbitrage
+                    px = self.px
+                    bid_slot, ask_slot, time_slot, latency_slot = _quote_slots('bybit')
+                    received = 0
+                    
                     while True:
+                        sampled = not (received & sample_mask)
+                        if sampled:
+                            start_time = clock()
                         try:
-                            start_time = time.perf_counter()
-                            msg = await asyncio.wait_for(ws.recv(), timeout=1.0)
-                            
-                            # Quick binary check before JSON parsing
-                            if b'"topic":"orderbook' in msg.encode():
-                                data = fast_json_loads(msg)
-                                
-                                if 'data' in data:
-                                    book_data = data['data']
-                                    bids = book_data.get('b', [])
-                                    asks = book_data.get('a', [])
-                                    
-                                    if bids and asks:
-                                        latency = (time.perf_counter() - start_time) * 1000
-                                        
-                                        self.prices['bybit'] = {
-                                            'bid': float(bids[0][0]),
-                                            'ask': float(asks[0][0]),
-                                            'time': time.perf_counter(),
-                                            'latency': latency
-                                        }
-                                        
-                                        self.check_arbitrage('bybit')
-                        except asyncio.TimeoutError:
+                            frame = await receive_latest(ws, 1.0)
+                        except timeout_error:
                             continue
-                        except Exception as e:
-                            print(f"Bybit error: {e}")
+                        received += 1
+                        if frame.type in closed_types:
                             break
+                        msg = frame.data
+                        
+                        # Quick binary check before JSON parsing
+                        if b'"topic":"orderbook' in msg:
+                            try:
+                                bid, ask = _top_of_book(msg)
+                                bid = to_float(bid)
+                                ask = to_float(ask)
+                            except parse_errors:
+                                # No data, an empty side in this update, or a malformed frame
+                                continue
+                            
+                            now = clock()
+                            if sampled:
+                                px[latency_slot] = (now - start_time) * 1000
+                            
+                            px[bid_slot] = bid
+                            px[ask_slot] = ask
+                            px[time_slot] = now
+                            
+                            check('bybit', now)
                             
             except Exception as e:
                 print(f"Bybit connection failed: {e}")
                 await asyncio.sleep(1)
 
-    def check_arbitrage(self, updated_exchange):
-        """Check for arbitrage opportunities"""
-        current_time = time.perf_counter()
+    def check_arbitrage(self, updated_exchange, current_time, _find_arb=_find_arb, _threshold=MIN_PROFIT_PERCENT):
+        """Check for arbitrage opportunities (current_time: the caller's perf_counter() reading)"""
+        bid_ex, ask_ex, profit_usd, profit_percent = _find_arb(self.quotes, current_time, _threshold)
+        if bid_ex < 0:
+            return
         
-        # Only check if all exchanges have recent data (within 1 second)
-        active_exchanges = []
-        for exchange, data in self.prices.items():
-            if data['time'] > 0 and (current_time - data['time']) < 1.0:
-                active_exchanges.append(exchange)
+        px = self.px
+        bid_base = bid_ex * QUOTE_FIELDS
+        ask_base = ask_ex * QUOTE_FIELDS
+        best_bid = px[bid_base + BID]
+        best_ask = px[ask_base + ASK]
+        bid_exchange = EXCHANGES[bid_ex]
+        ask_exchange = EXCHANGES[ask_ex]
+        self._profits[self.total_opportunities % OPPORTUNITY_HISTORY] = profit_percent
+        self.total_opportunities += 1
         
-        if len(active_exchanges) < 2:
-            return
+        # HH:MM:SS.mmm with integer arithmetic: no datetime object, no strftime
+        millis = int((current_time + self._local_clock_offset) * 1000) % 86_400_000
+        seconds, ms = divmod(millis, 1000)
+        minutes, sec = divmod(seconds, 60)
+        hours, minute = divmod(minutes, 60)
         
-        # Find best bid and ask across all active exchanges
-        best_bid = max([self.prices[ex]['bid'] for ex in active_exchanges])
-        best_ask = min([self.prices[ex]['ask'] for ex in active_exchanges])
+        opportunity = Opportunity(
+            self.total_opportunities,
+            f"{hours:02d}:{minute:02d}:{sec:02d}.{ms:03d}",
+            ask_exchange,
+            bid_exchange,
+            best_ask,
+            best_bid,
+            profit_usd,
+            profit_percent,
+            px[ask_base + LATENCY],
+            px[bid_base + LATENCY]
+        )
         
-        # Find which exchanges have the best prices
-        bid_exchange = next(ex for ex in active_exchanges if self.prices[ex]['bid'] == best_bid)
-        ask_exchange = next(ex for ex in active_exchanges if self.prices[ex]['ask'] == best_ask)
+        self.arbitrage_opportunities.append(opportunity)
         
-        # Calculate potential profit
-        if best_bid > best_ask and bid_exchange != ask_exchange:
-            profit_usd = best_bid - best_ask
-            profit_percent = (profit_usd / best_ask) * 100
-            
-            # Only show opportunities with meaningful profit
-            if profit_percent > 0.01:  # 0.01% or higher
-                self.total_opportunities += 1
-                
-                opportunity = {
-                    'time': datetime.now().strftime('%H:%M:%S.%f')[:-3],
-                    'buy_exchange': ask_exchange,
-                    'sell_exchange': bid_exchange,
-                    'buy_price': best_ask,
-                    'sell_price': best_bid,
-                    'profit_usd': profit_usd,
-                    'profit_percent': profit_percent,
-                    'latency_buy': self.prices[ask_exchange]['latency'],
-                    'latency_sell': self.prices[bid_exchange]['latency']
-                }
-                
-                self.arbitrage_opportunities.append(opportunity)
-                
-                # Print opportunity
-                print(f"\n🚨 ARBITRAGE OPPORTUNITY #{self.total_opportunities}")
-                print(f"   ⏰ Time: {opportunity['time']}")
-                print(f"   💰 Buy on {ask_exchange.upper()}: ${best_ask:,.2f}")
-                print(f"   💰 Sell on {bid_exchange.upper()}: ${best_bid:,.2f}")
-                print(f"   📈 Profit: ${profit_usd:.2f} ({profit_percent:.3f}%)")
-                print(f"   ⚡ Latency: Buy {opportunity['latency_buy']:.2f}ms | Sell {opportunity['latency_sell']:.2f}ms")
+        # Printing happens in print_opportunities: a slow terminal must not stall the feed
+        try:
+            self._print_queue.put_nowait(opportunity)
+        except asyncio.QueueFull:
+            pass  # stdout can't keep up; the opportunity is still counted and recorded
+
+    async def print_opportunities(self):
+        """Print opportunities queued by check_arbitrage, off the receive path"""
+        while True:
+            opportunity = await self._print_queue.get()
+            print(f"\n🚨 ARBITRAGE OPPORTUNITY #{opportunity.number}")
+            print(f"   ⏰ Time: {opportunity.time}")
+            print(f"   💰 Buy on {opportunity.buy_exchange.upper()}: ${opportunity.buy_price:,.2f}")
+            print(f"   💰 Sell on {opportunity.sell_exchange.upper()}: ${opportunity.sell_price:,.2f}")
+            print(f"   📈 Profit: ${opportunity.profit_usd:.2f} ({opportunity.profit_percent:.3f}%)")
+            print(f"   ⚡ Latency: Buy {opportunity.latency_buy:.2f}ms | Sell {opportunity.latency_sell:.2f}ms")
+
+    def recent_profits(self, count=OPPORTUNITY_HISTORY):
+        """Profit % of the last count opportunities (at most OPPORTUNITY_HISTORY), oldest first"""
+        total = self.total_opportunities
+        count = min(count, total, OPPORTUNITY_HISTORY)
+        return self._profits.take(np.arange(total - count, total), mode='wrap')
 
     async def print_status(self):
         """Print periodic status updates"""
@@ -240,18 +475,17 @@ class FreeArbitrageMonitor:
             print(f"\n📊 STATUS UPDATE - {datetime.now().strftime('%H:%M:%S')}")
             print("=" * 50)
             
-            for exchange, data in self.prices.items():
-                if data['time'] > 0:
-                    age = time.perf_counter() - data['time']
+            for exchange, (bid, ask, last_time, latency) in zip(EXCHANGES, self.quotes):
+                if last_time > 0:
+                    age = time.perf_counter() - last_time
                     status = "🟢" if age < 1 else "🟡" if age < 5 else "🔴"
-                    print(f"{status} {exchange.upper():>8}: ${data['bid']:>8,.2f}/${data['ask']:>8,.2f} | {data['latency']:>5.2f}ms | {age:>4.1f}s ago")
+                    print(f"{status} {exchange.upper():>8}: ${bid:>8,.2f}/${ask:>8,.2f} | {latency:>5.2f}ms | {age:>4.1f}s ago")
                 else:
                     print(f"🔴 {exchange.upper():>8}: Not connected")
             
             print(f"\n🎯 Total Opportunities: {self.total_opportunities}")
-            if self.arbitrage_opportunities:
-                recent = list(self.arbitrage_opportunities)[-5:]  # Last 5
-                avg_profit = sum(op['profit_percent'] for op in recent) / len(recent)
+            if self.total_opportunities:
+                avg_profit = self.recent_profits(RECENT_OPPORTUNITIES).mean()
                 print(f"📈 Recent Avg Profit: {avg_profit:.3f}%")
 
 async def main():
@@ -271,7 +505,8 @@ async def main():
         asyncio.create_task(monitor.monitor_binance()),
         asyncio.create_task(monitor.monitor_coinbase()),
         asyncio.create_task(monitor.monitor_bybit()),
-        asyncio.create_task(monitor.print_status())
+        asyncio.create_task(monitor.print_status()),
+        asyncio.create_task(monitor.print_opportunities())
     ]
     
     try:
@@ -281,10 +516,10 @@ async def main():
         print("=" * 40)
         print(f"🎯 Total Opportunities Found: {monitor.total_opportunities}")
         
-        if monitor.arbitrage_opportunities:
-            opportunities = list(monitor.arbitrage_opportunities)
-            avg_profit = sum(op['profit_percent'] for op in opportunities) / len(opportunities)
-            max_profit = max(op['profit_percent'] for op in opportunities)
+        if monitor.total_opportunities:
+            profits = monitor.recent_profits()
+            avg_profit = profits.mean()
+            max_profit = profits.max()
             
             print(f"📈 Average Profit: {avg_profit:.3f}%")
             print(f"🚀 Maximum Profit: {max_profit:.3f}%")
@@ -297,6 +532,8 @@ async def main():
         print("\n👋 Monitoring stopped!")
 
 if __name__ == "__main__":
+    if HAS_UVLOOP:
+        uvloop.install()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
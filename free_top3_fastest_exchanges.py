@@ -6,12 +6,16 @@ No colocation required - pure software optimization
 """
 
 import asyncio
+import gc
+import os
 import time
 import json
 import websockets
 import logging
 from collections import deque
-import statistics
+from dataclasses import dataclass
+from typing import Callable
+import numpy as np
 
 # Minimal logging for maximum speed
 logging.basicConfig(level=logging.ERROR)
@@ -29,285 +33,278 @@ except ImportError:
     fast_json_dumps = json.dumps
     print("📊 Using standard json (install orjson for 30% speed boost)")
 
+try:
+    import uvloop
+    HAS_UVLOOP = True
+    print("⚡ Using uvloop event loop")
+except ImportError:
+    HAS_UVLOOP = False
+    print("📊 Using standard asyncio event loop (install uvloop for faster recv dispatch)")
+
+try:
+    # Sans-I/O client (websockets >= 13): frames are parsed straight off the protocol buffer,
+    # and it's what the top-level websockets.connect resolves to from 14 on
+    from websockets.asyncio.client import connect as ws_connect
+except ImportError:
+    ws_connect = websockets.connect  # Legacy implementation
+
+# One timer for the whole test window instead of asyncio.wait_for around every recv(),
+# which wraps each call in a new Task plus a timer handle that is cancelled right after
+try:
+    from asyncio import timeout as _timeout  # Python 3.11+
+except ImportError:
+    from async_timeout import timeout as _timeout
+
+# Progress lines are printed by a side task at this cadence, not from the receive path
+PROGRESS_INTERVAL = 0.5
+# Latency buffers are pre-sized for this message rate so the recv loop never grows them;
+# samples past capacity are dropped rather than reallocating mid-test
+MAX_MSG_RATE = 5000
+# Core the benchmark is pinned to; isolate it with isolcpus=3 on the kernel command line
+# so the latency tail reflects the recv loop rather than scheduler migrations
+PINNED_CPU = 3
+PINNED_NICE = -10
+
+# Subscriptions are literals: serialized once at import, not on every test run.
+# Kept as str (stdlib json) so websockets sends a text frame; orjson's bytes would go out binary
+BYBIT_SUBSCRIBE = json.dumps({"op": "subscribe", "args": ["orderbook.1.BTCUSDT"]}, separators=(',', ':'))
+COINBASE_SUBSCRIBE = json.dumps({
+    "type": "subscribe",
+    "product_ids": ["BTC-USD"],
+    "channels": [{"name": "ticker", "product_ids": ["BTC-USD"]}]
+}, separators=(',', ':'))
+
+try:
+    import _extreme_parse  # cythonize -3 -i _extreme_parse.pyx
+    HAS_C_PARSER = True
+    print("⚡ Using C frame scanners (_extreme_parse)")
+except ImportError:
+    HAS_C_PARSER = False
+    print("📊 Using pure Python frame parsers (build _extreme_parse.pyx for C scanners)")
+
+# Frame parsers: str frame -> (server ts ms or None, bid, ask), or None when the frame
+# carries no quote. Same contract as the _extreme_parse scanners that run ahead of them below
+
+def parse_binance(msg):
+    """(None, bid, ask) from a Binance bookTicker frame"""
+    # Flat fixed-schema frame {"u":..,"s":"..","b":"..","B":"..","a":"..",..}:
+    # one C-level split on quotes puts the keys/prices at fixed slots,
+    # no JSON tokenizer or dict build (key check guards a schema change)
+    parts = msg.split('"', 18)
+    if len(parts) > 17 and parts[7] == 'b' and parts[15] == 'a':
+        return None, float(parts[9]), float(parts[17])
+    return None
+
+def parse_bybit(msg, topic_pattern='"topic":"orderbook', data_pattern='"data":'):
+    """(server ts ms, bid, ask) from a Bybit orderbook frame"""
+    # Ultra-fast substring search before JSON parsing: text frames arrive as str, so the
+    # patterns are str too rather than encoding every frame to UTF-8 bytes first
+    if topic_pattern not in msg or data_pattern not in msg:
+        return None
+    data = fast_json_loads(msg)
+    book_data = data['data']
+    bids = book_data.get('b')
+    asks = book_data.get('a')
+    if not bids or not asks:
+        return None
+    return data.get('ts'), float(bids[0][0]), float(asks[0][0])
+
+def parse_coinbase(msg, ticker_mark='"type":"ticker"'):
+    """(None, bid, ask) from a Coinbase ticker frame"""
+    # Subscription acks, heartbeats and errors fail the substring gate before any JSON parse
+    if ticker_mark not in msg:
+        return None
+    data = fast_json_loads(msg)
+    if 'best_bid' not in data or 'best_ask' not in data:
+        return None
+    return None, float(data['best_bid']), float(data['best_ask'])
+
+def _c_first(c_parse, py_parse):
+    """C scanner first; a frame it doesn't recognise goes to the Python parser instead of being dropped"""
+    def parse(msg):
+        quote = c_parse(msg)
+        return quote if quote is not None else py_parse(msg)
+    return parse
+
+if HAS_C_PARSER:
+    # strstr/strtod over the str's own UTF-8 buffer: the common-case parse runs in C
+    parse_binance = _c_first(_extreme_parse.parse_binance, parse_binance)
+    parse_bybit = _c_first(_extreme_parse.parse_bybit, parse_bybit)
+    parse_coinbase = _c_first(_extreme_parse.parse_coinbase, parse_coinbase)
+
+@dataclass(frozen=True)
+class FreeTestConfig:
+    """Everything that differs between the three per-exchange tests"""
+    exchange: str
+    title: str              # start banner, followed by " for {duration}s..."
+    location: str
+    method: str             # banner line: how frames are read
+    ranking_method: str     # method shown in the final rankings
+    rank: int
+    url: str
+    parse: Callable         # str frame -> (server ts ms or None, bid, ask) or None
+    max_size: int           # Oversize frames close the socket (1009), so leave headroom
+    subscribe: str = None
+    label: str = None       # progress/error line prefix, defaults to exchange
+    avg_window: int = 20
+
+BINANCE_FREE = FreeTestConfig(
+    exchange='Binance', title="🥇 Testing BINANCE ULTRA-FAST (FREE)",
+    location='Global CDN', method='Direct WebSocket + Fixed-schema field scan',
+    ranking_method='Direct WebSocket (FREE)', rank=1,
+    url="wss://stream.binance.com:9443/ws/btcusdt@bookTicker", parse=parse_binance,
+    max_size=4096,  # bookTicker is ~150 bytes
+    avg_window=50
+)
+
+BYBIT_FREE = FreeTestConfig(
+    exchange='Bybit', title="🥈 Testing BYBIT ULTRA-FAST (FREE)",
+    location='Singapore/Global', method='Optimized WebSocket + Pattern pre-filter',
+    ranking_method='Optimized WebSocket + Pattern Search (FREE)', rank=2,
+    url="wss://stream.bybit.com/v5/public/spot", parse=parse_bybit,
+    max_size=1024, subscribe=BYBIT_SUBSCRIBE,
+    avg_window=30
+)
+
+COINBASE_FREE = FreeTestConfig(
+    exchange='Coinbase Pro', title="🥉 Testing COINBASE PRO ULTRA-FAST (FREE)",
+    location='US/Global', method='Level2 WebSocket + Optimized parsing',
+    ranking_method='Ticker WebSocket + Fast JSON (FREE)', rank=3,
+    url="wss://ws-feed.exchange.coinbase.com", parse=parse_coinbase,
+    max_size=65536,  # Subscription acks and error frames run larger than tickers
+    subscribe=COINBASE_SUBSCRIBE, label='Coinbase',
+    avg_window=20
+)
+
 class FreeSpeedOptimizer:
     def __init__(self):
         self.results = []
         
-    async def test_binance_ultra_fast(self, duration=15):
-        """🥇 BINANCE - Fastest exchange globally (FREE)"""
-        print(f"🥇 Testing BINANCE ULTRA-FAST (FREE) for {duration}s...")
-        print("   🌍 Location: Global CDN (automatically optimal)")
-        print("   📡 Method: Direct WebSocket + Ultra optimization")
+    async def _progress_printer(self, name, latest, latencies, window):
+        """Print the newest (count, bid, ask, latency) sample every PROGRESS_INTERVAL"""
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            if not latest:
+                continue
+            message_count, bid, ask, latency = latest.pop()
+            recent_avg = latencies[max(0, message_count - window):message_count].mean() / 1e3
+            print(f"🔥 {name}: {bid:.2f}/{ask:.2f} | Current: {latency / 1e3:.2f}µs | Avg: {recent_avg:.2f}µs | Count: {message_count}")
+    
+    async def _run_test(self, cfg, duration=15):
+        """Run one exchange test described by a FreeTestConfig: recv -> parsed quote time per frame"""
+        label = cfg.label or cfg.exchange
+        print(f"{cfg.title} for {duration}s...")
+        print(f"   🌍 Location: {cfg.location}")
+        print(f"   📡 Method: {cfg.method}")
         
-        latencies = []
+        latencies = np.empty(int(duration * MAX_MSG_RATE), dtype=np.int64)  # ns samples, filled [:message_count]
+        latest = deque(maxlen=1)  # Newest sample for the progress printer
         message_count = 0
-        url = "wss://stream.binance.com:9443/ws/btcusdt@bookTicker"
+        dropped = 0  # Frames that raised while parsing
+        last_error = None
         
         try:
             # Ultra-optimized connection settings
-            async with websockets.connect(
-                url,
+            async with ws_connect(
+                cfg.url,
                 ping_interval=None,
                 ping_timeout=None,
                 compression=None,
-                max_size=512,
+                max_size=cfg.max_size,
                 close_timeout=0.1
             ) as ws:
-                start_time = time.perf_counter()
+                if cfg.subscribe:
+                    await ws.send(cfg.subscribe)
                 
-                while time.perf_counter() - start_time < duration:
-                    try:
-                        msg_start = time.perf_counter()
-                        
-                        # Ultra-fast receive with timeout
-                        msg = await asyncio.wait_for(ws.recv(), timeout=0.01)
-                        recv_time = time.perf_counter()
-                        
-                        # Fast JSON parsing
-                        data = fast_json_loads(msg)
-                        if 'b' in data and 'a' in data:
-                            bid = float(data['b'])
-                            ask = float(data['a'])
-                            latency = (recv_time - msg_start) * 1000
-                            latencies.append(latency)
-                            message_count += 1
+                # Hot-loop names bound once: LOAD_FAST instead of global/attribute lookups
+                # Integer nanosecond clock: no float boxing per reading; µs conversion happens at report time
+                pc = time.perf_counter_ns
+                timeout = _timeout
+                recv = ws.recv
+                timeout_error = asyncio.TimeoutError
+                connection_closed = websockets.ConnectionClosed
+                parse = cfg.parse
+                push = latest.append
+                printer = asyncio.create_task(self._progress_printer(label, latest, latencies, cfg.avg_window))
+                try:
+                    async with timeout(duration):
+                        while True:
+                            try:
+                                msg = await recv()
+                                recv_time = pc()
+                                
+                                quote = parse(msg)
+                                if quote is not None:
+                                    _, bid, ask = quote
+                                    # recv -> parsed quote only: time spent in the await is the exchange's
+                                    # emission cadence (already msg/s), not anything this loop controls
+                                    latency = pc() - recv_time
+                                    latencies[message_count] = latency
+                                    message_count += 1
+                                    push((message_count, bid, ask, latency))
                             
-                            if message_count % 100 == 0:
-                                recent_avg = statistics.mean(latencies[-50:]) if len(latencies) >= 50 else statistics.mean(latencies)
-                                print(f"🔥 Binance: {bid:.2f}/{ask:.2f} | Current: {latency:.2f}ms | Avg: {recent_avg:.2f}ms | Count: {message_count}")
-                        
-                    except asyncio.TimeoutError:
-                        continue
-                    except Exception:
-                        continue
-                        
+                            except connection_closed as e:
+                                # recv() would raise again immediately: leave rather than spin until the deadline
+                                print(f"❌ {label} connection closed mid-test: {e}")
+                                break
+                            except Exception as e:
+                                # Counted, not silently dropped: a parse bug would otherwise read as a fast, quiet feed
+                                dropped += 1
+                                last_error = e
+                except timeout_error:
+                    pass  # Test window elapsed
+                finally:
+                    printer.cancel()
+        
         except Exception as e:
-            print(f"❌ Binance connection error: {e}")
+            print(f"❌ {label} connection error: {e}")
             return None
         
-        if latencies:
-            avg_latency = statistics.mean(latencies)
-            min_latency = min(latencies)
-            max_latency = max(latencies)
-            median_latency = statistics.median(latencies)
+        if message_count:
+            lat = latencies[:message_count]
+            avg_latency = float(lat.mean()) / 1e3
+            min_latency = int(lat.min()) / 1e3
+            max_latency = int(lat.max()) / 1e3
+            median_latency = float(np.median(lat)) / 1e3
             msg_per_sec = message_count / duration
+            grade = 'EXCELLENT' if avg_latency < 5 else 'VERY GOOD' if avg_latency < 20 else 'GOOD'
             
-            print(f"✅ BINANCE RESULTS:")
+            print(f"✅ {cfg.exchange.upper()} RESULTS:")
             print(f"   📈 Speed: {msg_per_sec:.1f} msg/s")
-            print(f"   ⚡ Avg Latency: {avg_latency:.2f}ms")
-            print(f"   🚀 Min Latency: {min_latency:.2f}ms")
-            print(f"   📊 Median: {median_latency:.2f}ms")
-            print(f"   📈 Max: {max_latency:.2f}ms")
-            print(f"   🎯 Grade: {'🔥 EXCELLENT' if avg_latency < 5 else '✅ VERY GOOD' if avg_latency < 10 else '📊 GOOD'}")
+            print(f"   ⚡ Avg Latency: {avg_latency:.2f}µs")
+            print(f"   🚀 Min Latency: {min_latency:.2f}µs")
+            print(f"   📊 Median: {median_latency:.2f}µs")
+            print(f"   📈 Max: {max_latency:.2f}µs")
+            print(f"   🎯 Grade: {'🔥' if grade == 'EXCELLENT' else '✅' if grade == 'VERY GOOD' else '📊'} {grade}")
+            if dropped:
+                print(f"   ⚠️ Dropped frames: {dropped} (last error: {last_error!r})")
             
             return {
-                'exchange': 'Binance',
-                'rank': 1,
-                'method': 'Direct WebSocket (FREE)',
-                'location': 'Global CDN',
+                'exchange': cfg.exchange,
+                'rank': cfg.rank,
+                'method': cfg.ranking_method,
+                'location': cfg.location,
                 'cost': '$0/month',
                 'avg_latency': avg_latency,
                 'min_latency': min_latency,
                 'median_latency': median_latency,
                 'msg_per_sec': msg_per_sec,
                 'total_messages': message_count,
-                'grade': 'EXCELLENT' if avg_latency < 5 else 'VERY GOOD' if avg_latency < 10 else 'GOOD'
+                'grade': grade
             }
         return None
-
+    
+    async def test_binance_ultra_fast(self, duration=15):
+        """🥇 BINANCE - Fastest exchange globally (FREE)"""
+        return await self._run_test(BINANCE_FREE, duration)
+    
     async def test_bybit_ultra_fast(self, duration=15):
         """🥈 BYBIT - Second fastest exchange (FREE)"""
-        print(f"🥈 Testing BYBIT ULTRA-FAST (FREE) for {duration}s...")
-        print("   🌍 Location: Singapore/Global")
-        print("   📡 Method: Optimized WebSocket + Binary patterns")
-        
-        latencies = []
-        message_count = 0
-        url = "wss://stream.bybit.com/v5/public/spot"
-        
-        # Pre-compile subscription message
-        subscribe_msg = fast_json_dumps({"op": "subscribe", "args": ["orderbook.1.BTCUSDT"]})
-        
-        try:
-            # Optimized connection for Bybit
-            async with websockets.connect(
-                url,
-                ping_interval=None,
-                ping_timeout=None,
-                compression=None,
-                max_size=1024,
-                close_timeout=0.1
-            ) as ws:
-                # Send subscription
-                await ws.send(subscribe_msg)
-                
-                # Pre-compile binary patterns for ultra-fast parsing
-                topic_pattern = b'"topic":"orderbook'
-                data_pattern = b'"data":'
-                
-                start_time = time.perf_counter()
-                
-                while time.perf_counter() - start_time < duration:
-                    try:
-                        msg_start = time.perf_counter()
-                        msg = await asyncio.wait_for(ws.recv(), timeout=0.01)
-                        recv_time = time.perf_counter()
-                        
-                        # Ultra-fast binary search before JSON parsing
-                        if isinstance(msg, str):
-                            msg_bytes = msg.encode()
-                        else:
-                            msg_bytes = msg
-                        
-                        if topic_pattern in msg_bytes and data_pattern in msg_bytes:
-                            # Only parse JSON if it contains orderbook data
-                            data = fast_json_loads(msg_bytes)
-                            
-                            if 'data' in data:
-                                book_data = data['data']
-                                bids = book_data.get('b', [])
-                                asks = book_data.get('a', [])
-                                
-                                if bids and asks:
-                                    bid = float(bids[0][0])
-                                    ask = float(asks[0][0])
-                                    latency = (recv_time - msg_start) * 1000
-                                    latencies.append(latency)
-                                    message_count += 1
-                                    
-                                    if message_count % 50 == 0:
-                                        recent_avg = statistics.mean(latencies[-30:]) if len(latencies) >= 30 else statistics.mean(latencies)
-                                        print(f"🔥 Bybit: {bid:.2f}/{ask:.2f} | Current: {latency:.2f}ms | Avg: {recent_avg:.2f}ms | Count: {message_count}")
-                        
-                    except asyncio.TimeoutError:
-                        continue
-                    except Exception:
-                        continue
-                        
-        except Exception as e:
-            print(f"❌ Bybit connection error: {e}")
-            return None
-        
-        if latencies:
-            avg_latency = statistics.mean(latencies)
-            min_latency = min(latencies)
-            max_latency = max(latencies)
-            median_latency = statistics.median(latencies)
-            msg_per_sec = message_count / duration
-            
-            print(f"✅ BYBIT RESULTS:")
-            print(f"   📈 Speed: {msg_per_sec:.1f} msg/s")
-            print(f"   ⚡ Avg Latency: {avg_latency:.2f}ms")
-            print(f"   🚀 Min Latency: {min_latency:.2f}ms")
-            print(f"   📊 Median: {median_latency:.2f}ms")
-            print(f"   📈 Max: {max_latency:.2f}ms")
-            print(f"   🎯 Grade: {'🔥 EXCELLENT' if avg_latency < 15 else '✅ VERY GOOD' if avg_latency < 25 else '📊 GOOD'}")
-            
-            return {
-                'exchange': 'Bybit',
-                'rank': 2,
-                'method': 'Optimized WebSocket + Binary Search (FREE)',
-                'location': 'Singapore/Global',
-                'cost': '$0/month',
-                'avg_latency': avg_latency,
-                'min_latency': min_latency,
-                'median_latency': median_latency,
-                'msg_per_sec': msg_per_sec,
-                'total_messages': message_count,
-                'grade': 'EXCELLENT' if avg_latency < 15 else 'VERY GOOD' if avg_latency < 25 else 'GOOD'
-            }
-        return None
-
+        return await self._run_test(BYBIT_FREE, duration)
+    
     async def test_coinbase_ultra_fast(self, duration=15):
         """🥉 COINBASE PRO - Third fastest with high reliability (FREE)"""
-        print(f"🥉 Testing COINBASE PRO ULTRA-FAST (FREE) for {duration}s...")
-        print("   🌍 Location: US/Global")
-        print("   📡 Method: Level2 WebSocket + Optimized parsing")
-        
-        latencies = []
-        message_count = 0
-        url = "wss://ws-feed.exchange.coinbase.com"
-        
-        # Subscription message for BTC-USD
-        subscribe_msg = fast_json_dumps({
-            "type": "subscribe",
-            "product_ids": ["BTC-USD"],
-            "channels": ["ticker"]
-        })
-        
-        try:
-            # Optimized connection for Coinbase
-            async with websockets.connect(
-                url,
-                ping_interval=None,
-                ping_timeout=None,
-                compression=None,
-                max_size=1024,
-                close_timeout=0.1
-            ) as ws:
-                # Send subscription
-                await ws.send(subscribe_msg)
-                
-                start_time = time.perf_counter()
-                
-                while time.perf_counter() - start_time < duration:
-                    try:
-                        msg_start = time.perf_counter()
-                        msg = await asyncio.wait_for(ws.recv(), timeout=0.01)
-                        recv_time = time.perf_counter()
-                        
-                        # Fast JSON parsing with direct key access
-                        data = fast_json_loads(msg)
-                        
-                        if data.get('type') == 'ticker' and 'best_bid' in data and 'best_ask' in data:
-                            bid = float(data['best_bid'])
-                            ask = float(data['best_ask'])
-                            latency = (recv_time - msg_start) * 1000
-                            latencies.append(latency)
-                            message_count += 1
-                            
-                            if message_count % 30 == 0:
-                                recent_avg = statistics.mean(latencies[-20:]) if len(latencies) >= 20 else statistics.mean(latencies)
-                                print(f"🔥 Coinbase: {bid:.2f}/{ask:.2f} | Current: {latency:.2f}ms | Avg: {recent_avg:.2f}ms | Count: {message_count}")
-                        
-                    except asyncio.TimeoutError:
-                        continue
-                    except Exception:
-                        continue
-                        
-        except Exception as e:
-            print(f"❌ Coinbase connection error: {e}")
-            return None
-        
-        if latencies:
-            avg_latency = statistics.mean(latencies)
-            min_latency = min(latencies)
-            max_latency = max(latencies)
-            median_latency = statistics.median(latencies)
-            msg_per_sec = message_count / duration
-            
-            print(f"✅ COINBASE PRO RESULTS:")
-            print(f"   📈 Speed: {msg_per_sec:.1f} msg/s")
-            print(f"   ⚡ Avg Latency: {avg_latency:.2f}ms")
-            print(f"   🚀 Min Latency: {min_latency:.2f}ms")
-            print(f"   📊 Median: {median_latency:.2f}ms")
-            print(f"   📈 Max: {max_latency:.2f}ms")
-            print(f"   🎯 Grade: {'🔥 EXCELLENT' if avg_latency < 20 else '✅ VERY GOOD' if avg_latency < 35 else '📊 GOOD'}")
-            
-            return {
-                'exchange': 'Coinbase Pro',
-                'rank': 3,
-                'method': 'Ticker WebSocket + Fast JSON (FREE)',
-                'location': 'US/Global',
-                'cost': '$0/month',
-                'avg_latency': avg_latency,
-                'min_latency': min_latency,
-                'median_latency': median_latency,
-                'msg_per_sec': msg_per_sec,
-                'total_messages': message_count,
-                'grade': 'EXCELLENT' if avg_latency < 20 else 'VERY GOOD' if avg_latency < 35 else 'GOOD'
-            }
-        return None
+        return await self._run_test(COINBASE_FREE, duration)
 
     def print_free_optimization_tips(self):
         """Print free optimization tips"""
@@ -337,20 +334,37 @@ class FreeSpeedOptimizer:
         print("   2. 📈 Better internet: Fiber connection $30-100/month")
         print("   3. 🖥️ Dedicated server: $50-200/month")
 
+def pin_to_cpu(cpu=PINNED_CPU, niceness=PINNED_NICE):
+    """Pin this process to one core and raise its scheduling priority where the OS allows"""
+    if not hasattr(os, 'sched_setaffinity'):
+        print("📊 CPU pinning unavailable on this platform")
+        return
+    allowed = os.sched_getaffinity(0)
+    if cpu not in allowed:
+        cpu = max(allowed)
+    os.sched_setaffinity(0, {cpu})
+    print(f"📌 Pinned to CPU {cpu}")
+    try:
+        os.nice(niceness - os.nice(0))
+        print(f"⚡ Scheduling priority raised (nice {niceness})")
+    except PermissionError:
+        print("📊 Running at default priority (raising it needs root/CAP_SYS_NICE)")
+
 async def main():
     """Test the 3 fastest exchanges with free optimization"""
+    pin_to_cpu()
     optimizer = FreeSpeedOptimizer()
     
     print("🚀 TOP 3 FASTEST EXCHANGES - FREE OPTIMIZATION")
     print("=" * 80)
     print("🎯 Objective: Find the fastest exchanges using FREE methods only")
     print("💰 Total Cost: $0/month (pure software optimization)")
-    print("📊 Target: Sub-10ms for top exchanges")
+    print("📊 Measures: recv → parsed quote time per frame (µs) and feed rate (msg/s)")
     
     # Print optimization tips
     optimizer.print_free_optimization_tips()
     
-    test_duration = 15  # 15 seconds per test
+    test_duration = 15  # 15 seconds, all tests at once
     results = []
     
     # Test the top 3 fastest exchanges
@@ -360,23 +374,36 @@ async def main():
         ("Coinbase Pro Ultra-Fast", optimizer.test_coinbase_ultra_fast),
     ]
     
-    print(f"\n🧪 RUNNING TESTS ({test_duration}s each)...")
+    print(f"\n🧪 RUNNING TESTS ({test_duration}s, concurrently)...")
     print("=" * 60)
     
-    for test_name, test_func in tests:
-        print(f"\n🔬 Starting: {test_name}")
-        try:
-            result = await test_func(test_duration)
-            if result:
-                results.append(result)
-                print(f"✅ Completed: {test_name}")
-            else:
-                print(f"❌ Failed: {test_name}")
-        except Exception as e:
-            print(f"💥 Error in {test_name}: {e}")
-        
-        # Brief pause between tests
-        await asyncio.sleep(2)
+    # Each test owns its own connection and local state, so they share one event loop:
+    # the suite takes ~one test duration instead of three plus pauses
+    # Progress lines are single exchange-tagged prints and each results block is printed
+    # without an await in between, so concurrent output doesn't interleave mid-block
+    # Cyclic GC stays off for the measurement window (startup objects frozen out of it),
+    # so collector pauses don't land in the max latency
+    gc.collect()
+    gc.freeze()
+    gc.disable()
+    try:
+        outcomes = await asyncio.gather(
+            *(test_func(test_duration) for _, test_func in tests),
+            return_exceptions=True
+        )
+    finally:
+        gc.enable()
+        gc.unfreeze()
+        gc.collect()
+    
+    for (test_name, _), result in zip(tests, outcomes):
+        if isinstance(result, Exception):
+            print(f"💥 Error in {test_name}: {result}")
+        elif result:
+            results.append(result)
+            print(f"✅ Completed: {test_name}")
+        else:
+            print(f"❌ Failed: {test_name}")
     
     # Print final results
     print("\n" + "🏆" * 80)
@@ -396,9 +423,9 @@ async def main():
             print(f"   📡 Method: {result['method']}")
             print(f"   🌍 Location: {result['location']}")
             print(f"   💰 Cost: {result['cost']}")
-            print(f"   ⚡ Avg Latency: {result['avg_latency']:.2f}ms")
-            print(f"   🚀 Min Latency: {result['min_latency']:.2f}ms")
-            print(f"   📊 Median: {result['median_latency']:.2f}ms")
+            print(f"   ⚡ Avg Latency: {result['avg_latency']:.2f}µs")
+            print(f"   🚀 Min Latency: {result['min_latency']:.2f}µs")
+            print(f"   📊 Median: {result['median_latency']:.2f}µs")
             print(f"   📈 Speed: {result['msg_per_sec']:.1f} msg/s")
             print(f"   🎯 Grade: {grade_emoji} {result['grade']}")
             print()
@@ -406,8 +433,8 @@ async def main():
         # Performance summary
         best_exchange = results[0]
         print(f"🏅 BEST PERFORMER: {best_exchange['exchange']}")
-        print(f"   ⚡ Latency: {best_exchange['avg_latency']:.2f}ms average")
-        print(f"   🚀 Peak: {best_exchange['min_latency']:.2f}ms minimum")
+        print(f"   ⚡ Latency: {best_exchange['avg_latency']:.2f}µs average")
+        print(f"   🚀 Peak: {best_exchange['min_latency']:.2f}µs minimum")
         print(f"   📈 Throughput: {best_exchange['msg_per_sec']:.1f} messages/second")
         
         # Recommendations
@@ -434,6 +461,8 @@ async def main():
         print("💡 Check your internet connection and try again")
 
 if __name__ == "__main__":
+    if HAS_UVLOOP:
+        uvloop.install()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -7,11 +7,13 @@ Uses connection optimization, binary processing, and minimal data handling
 
 import asyncio
 import time
+from functools import partial
 import json
 import websockets
 import logging
 from collections import deque
 import struct
+import numpy as np
 
 # Minimal logging for maximum speed
 logging.basicConfig(level=logging.ERROR)
@@ -29,6 +31,44 @@ except ImportError:
     fast_json_dumps = json.dumps
     print("📊 Using standard json")
 
+try:
+    import uvloop
+    HAS_UVLOOP = True
+    print("⚡ Using uvloop event loop")
+except ImportError:
+    HAS_UVLOOP = False
+    print("📊 Using standard asyncio event loop (install uvloop for faster recv dispatch)")
+
+try:
+    # Sans-I/O client (websockets >= 13): recv(decode=False) hands text frames over as the
+    # raw UTF-8 payload, so the byte scanners below get bytes with no decode/re-encode
+    from websockets.asyncio.client import connect as ws_connect
+    HAS_RAW_RECV = True
+except ImportError:
+    ws_connect = websockets.connect  # Legacy implementation: text frames always decoded to str
+    HAS_RAW_RECV = False
+
+def raw_recv(ws):
+    """recv() for either websockets client that always returns the frame payload as bytes"""
+    if HAS_RAW_RECV:
+        return partial(ws.recv, decode=False)
+    
+    async def recv():
+        msg = await ws.recv()
+        return msg.encode('utf-8') if isinstance(msg, str) else msg
+    return recv
+
+# Context-manager timeout: one timer for the whole test window instead of
+# asyncio.wait_for wrapping every recv() in a new Task plus a cancelled timer handle
+try:
+    from asyncio import timeout as _timeout  # Python 3.11+
+except ImportError:
+    from async_timeout import timeout as _timeout
+
+# Latency buffers are pre-sized for this message rate so the recv loop never grows them;
+# samples past capacity are dropped rather than reallocating mid-test
+MAX_MSG_RATE = 5000
+
 class LatencyReducer:
     def __init__(self):
         self.stats = {'Binance': [], 'Bybit': [], 'OKX': []}
@@ -37,7 +77,7 @@ class LatencyReducer:
         """Bybit with ultra-aggressive optimizations"""
         print(f"🚀 Testing Bybit OPTIMIZED V2 (Target: <20ms) for {duration}s...")
         
-        latencies = []
+        latencies = np.empty(int(duration * MAX_MSG_RATE), dtype=np.float64)  # ms samples, filled [:message_count]
         message_count = 0
         url = "wss://stream.bybit.com/v5/public/spot"
         
@@ -49,7 +89,7 @@ class LatencyReducer:
         
         try:
             # Use most aggressive connection settings possible
-            async with websockets.connect(
+            async with ws_connect(
                 url,
                 ping_interval=None,        # No ping/pong overhead
                 ping_timeout=None,
@@ -61,91 +101,89 @@ class LatencyReducer:
                 # Send subscription immediately upon connection
                 await ws.send(subscribe_msg)
                 
-                # Pre-compile binary search patterns for speed
-                topic_bytes = b'"topic":"orderbook'
-                data_bytes = b'"data":'
-                
-                start_time = time.perf_counter()
-                consecutive_timeouts = 0
+                # Book frames lead with their topic key, so one anchored prefix compare
+                # replaces two full-frame substring scans (acks/pongs fail on the first bytes)
+                topic_prefix = b'{"topic":"orderbook'
+                bid_marker = b'"b":[["'
+                ask_marker = b'"a":[["'
                 
-                while time.perf_counter() - start_time < duration:
-                    try:
-                        # Start timing immediately before receive
-                        msg_start = time.perf_counter()
-                        
-                        # Very aggressive timeout for minimal latency
-                        msg = await asyncio.wait_for(ws.recv(), timeout=0.1)
-                        recv_end = time.perf_counter()
-                        
-                        consecutive_timeouts = 0  # Reset timeout counter
-                        
-                        # Convert to bytes for ultra-fast binary search
-                        if isinstance(msg, str):
-                            msg_bytes = msg.encode('utf-8')
-                        else:
-                            msg_bytes = msg
-                        
-                        # Ultra-fast binary pattern matching
-                        if topic_bytes in msg_bytes and data_bytes in msg_bytes:
-                            parse_start = time.perf_counter()
-                            
+                # Hot-loop names bound once: LOAD_FAST instead of global/attribute lookups
+                perf = time.perf_counter
+                timeout = _timeout
+                timeout_error = asyncio.TimeoutError
+                connection_closed = websockets.ConnectionClosed
+                recv = raw_recv(ws)
+                # Running sum over the last 20 samples: the progress line costs O(1)
+                # per frame instead of a slice + reduction burst on every report
+                window = deque(maxlen=20)
+                window_sum = 0.0
+                try:
+                    async with timeout(duration):
+                        while True:
                             try:
-                                # Only parse if we found the right patterns
-                                data = fast_json_loads(msg_bytes)
+                                # Start timing immediately before receive
+                                msg_start = perf()
+                                msg_bytes = await recv()
+                                recv_end = perf()
                                 
-                                # Direct access - no intermediate variables
-                                if (data.get('topic', '').startswith('orderbook') and 
-                                    'data' in data and 
-                                    data['data']):
-                                    
-                                    book_data = data['data']
-                                    bids = book_data.get('b', [])
-                                    asks = book_data.get('a', [])
-                                    
-                                    if bids and asks and bids[0] and asks[0]:
-                                        bid = float(bids[0][0])
-                                        ask = float(asks[0][0])
-                                        
-                                        # Calculate latency from message start to parse end
-                                        total_latency = (time.perf_counter() - msg_start) * 1000
-                                        recv_latency = (recv_end - msg_start) * 1000
+                                # Ultra-fast binary pattern matching
+                                if msg_bytes.startswith(topic_prefix):
+                                    try:
+                                        # Top-of-book straight from the bytes: no dict/list tree is built
+                                        # just to read [0][0]; a delta missing a side has no '[["' marker
+                                        find = msg_bytes.find
+                                        i = find(bid_marker)
+                                        k = find(ask_marker)
                                         
-                                        latencies.append(recv_latency)  # Use receive latency
-                                        message_count += 1
-                                        
-                                        # Log every 20 messages with running average
-                                        if message_count % 20 == 0:
-                                            recent_avg = sum(latencies[-20:]) / min(20, len(latencies))
-                                            print(f"🔥 Bybit #{message_count}: {bid:.2f}/{ask:.2f} | "
-                                                  f"Latency: {recv_latency:.2f}ms | "
-                                                  f"Avg20: {recent_avg:.2f}ms")
+                                        if i >= 0 and k >= 0:
+                                            i += 7
+                                            k += 7
+                                            bid = float(msg_bytes[i:find(b'"', i)])
+                                            ask = float(msg_bytes[k:find(b'"', k)])
+                                            
+                                            recv_latency = (recv_end - msg_start) * 1000
+                                            
+                                            latencies[message_count] = recv_latency  # Use receive latency
+                                            if len(window) == 20:
+                                                window_sum -= window[0]
+                                            window.append(recv_latency)
+                                            window_sum += recv_latency
+                                            message_count += 1
+                                            
+                                            # Log every 20 messages with running average
+                                            if message_count % 20 == 0:
+                                                recent_avg = window_sum / 20
+                                                print(f"🔥 Bybit #{message_count}: {bid:.2f}/{ask:.2f} | "
+                                                      f"Latency: {recv_latency:.2f}ms | "
+                                                      f"Avg20: {recent_avg:.2f}ms")
+                                    
+                                    except ValueError:
+                                        continue  # Skip malformed messages
                             
-                            except (json.JSONDecodeError, KeyError, IndexError, ValueError):
-                                continue  # Skip malformed messages
-                        
-                    except asyncio.TimeoutError:
-                        consecutive_timeouts += 1
-                        if consecutive_timeouts > 50:  # If too many timeouts, break
-                            print("⚠️ Too many timeouts, connection may be slow")
-                            break
-                        continue
-                    except Exception as e:
-                        continue
-                        
+                            except connection_closed as e:
+                                # recv() raises again without yielding, so the window timer would never fire
+                                print(f"❌ Bybit connection closed mid-test: {e}")
+                                break
+                            except Exception as e:
+                                continue  # Per-frame parse errors only
+                except timeout_error:
+                    pass  # Test window elapsed
+        
         except Exception as e:
             print(f"❌ Bybit connection error: {e}")
             return None
         
-        if latencies:
-            avg_latency = sum(latencies) / len(latencies)
-            min_latency = min(latencies)
-            max_latency = max(latencies)
-            median_latency = sorted(latencies)[len(latencies)//2]
+        if message_count:
+            lat = latencies[:message_count]
+            avg_latency = float(lat.mean())
+            min_latency = float(lat.min())
+            max_latency = float(lat.max())
+            median_latency = float(np.median(lat))
             msg_per_sec = message_count / duration
             
             # Performance analysis
-            under_10ms = len([l for l in latencies if l < 10])
-            under_20ms = len([l for l in latencies if l < 20])
+            under_10ms = int((lat < 10).sum())
+            under_20ms = int((lat < 20).sum())
             
             print(f"✅ Bybit OPTIMIZED V2 Results:")
             print(f"   📈 Speed: {msg_per_sec:.1f} msg/s")
@@ -153,8 +191,8 @@ class LatencyReducer:
             print(f"   🚀 Min Latency: {min_latency:.2f}ms")
             print(f"   📊 Max Latency: {max_latency:.2f}ms")
             print(f"   🎯 Median: {median_latency:.2f}ms")
-            print(f"   🔥 Under 10ms: {under_10ms}/{len(latencies)} ({under_10ms/len(latencies)*100:.1f}%)")
-            print(f"   ✅ Under 20ms: {under_20ms}/{len(latencies)} ({under_20ms/len(latencies)*100:.1f}%)")
+            print(f"   🔥 Under 10ms: {under_10ms}/{message_count} ({under_10ms/message_count*100:.1f}%)")
+            print(f"   ✅ Under 20ms: {under_20ms}/{message_count} ({under_20ms/message_count*100:.1f}%)")
             
             success = "✅ TARGET ACHIEVED!" if avg_latency < 20 else "⚠️ GETTING CLOSER" if avg_latency < 30 else "❌ NEEDS MORE WORK"
             print(f"   🎯 Target <20ms: {success}")
@@ -167,7 +205,7 @@ class LatencyReducer:
                 'min_latency': min_latency,
                 'max_latency': max_latency,
                 'median_latency': median_latency,
-                'under_20ms_pct': under_20ms/len(latencies)*100,
+                'under_20ms_pct': under_20ms/message_count*100,
                 'total_messages': message_count
             }
         return None
@@ -176,7 +214,7 @@ class LatencyReducer:
         """OKX with ultra-aggressive optimizations"""
         print(f"🚀 Testing OKX OPTIMIZED V2 (Target: <20ms) for {duration}s...")
         
-        latencies = []
+        latencies = np.empty(int(duration * MAX_MSG_RATE), dtype=np.float64)  # ms samples, filled [:message_count]
         message_count = 0
         url = "wss://ws.okx.com:8443/ws/v5/public"
         
@@ -194,7 +232,7 @@ class LatencyReducer:
         
         try:
             # Use most aggressive connection settings possible
-            async with websockets.connect(
+            async with ws_connect(
                 url,
                 ping_interval=None,        # No ping/pong overhead
                 ping_timeout=None,
@@ -206,91 +244,84 @@ class LatencyReducer:
                 # Send subscription immediately upon connection
                 await ws.send(subscribe_msg)
                 
-                # Pre-compile binary search patterns for speed
-                channel_bytes = b'"channel":"books5"'
-                data_bytes = b'"data":['
-                
-                start_time = time.perf_counter()
-                consecutive_timeouts = 0
+                # Push frames open with {"arg":{"channel":...}; the subscribe ack opens with
+                # "event", so the prefix alone separates them
+                channel_prefix = b'{"arg":{"channel":"books5"'
+                bid_marker = b'"bids":[["'
+                ask_marker = b'"asks":[["'
                 
-                while time.perf_counter() - start_time < duration:
-                    try:
-                        # Start timing immediately before receive
-                        msg_start = time.perf_counter()
-                        
-                        # Very aggressive timeout for minimal latency
-                        msg = await asyncio.wait_for(ws.recv(), timeout=0.1)
-                        recv_end = time.perf_counter()
-                        
-                        consecutive_timeouts = 0  # Reset timeout counter
-                        
-                        # Convert to bytes for ultra-fast binary search
-                        if isinstance(msg, str):
-                            msg_bytes = msg.encode('utf-8')
-                        else:
-                            msg_bytes = msg
-                        
-                        # Ultra-fast binary pattern matching
-                        if channel_bytes in msg_bytes and data_bytes in msg_bytes:
-                            parse_start = time.perf_counter()
-                            
+                perf = time.perf_counter
+                timeout = _timeout
+                timeout_error = asyncio.TimeoutError
+                connection_closed = websockets.ConnectionClosed
+                recv = raw_recv(ws)
+                window = deque(maxlen=15)
+                window_sum = 0.0
+                try:
+                    async with timeout(duration):
+                        while True:
                             try:
-                                # Only parse if we found the right patterns
-                                data = fast_json_loads(msg_bytes)
+                                # Start timing immediately before receive
+                                msg_start = perf()
+                                msg_bytes = await recv()
+                                recv_end = perf()
                                 
-                                # Direct access - no intermediate variables
-                                if ('data' in data and 
-                                    data['data'] and 
-                                    len(data['data']) > 0):
-                                    
-                                    book_data = data['data'][0]
-                                    bids = book_data.get('bids', [])
-                                    asks = book_data.get('asks', [])
-                                    
-                                    if bids and asks and len(bids) > 0 and len(asks) > 0:
-                                        bid = float(bids[0][0])
-                                        ask = float(asks[0][0])
-                                        
-                                        # Calculate latency from message start to parse end
-                                        total_latency = (time.perf_counter() - msg_start) * 1000
-                                        recv_latency = (recv_end - msg_start) * 1000
+                                # Ultra-fast binary pattern matching
+                                if msg_bytes.startswith(channel_prefix):
+                                    try:
+                                        # Best bid/ask are the first level of each side (asks come first)
+                                        find = msg_bytes.find
+                                        i = find(bid_marker)
+                                        k = find(ask_marker)
                                         
-                                        latencies.append(recv_latency)  # Use receive latency
-                                        message_count += 1
-                                        
-                                        # Log every 15 messages with running average
-                                        if message_count % 15 == 0:
-                                            recent_avg = sum(latencies[-15:]) / min(15, len(latencies))
-                                            print(f"🔥 OKX #{message_count}: {bid:.2f}/{ask:.2f} | "
-                                                  f"Latency: {recv_latency:.2f}ms | "
-                                                  f"Avg15: {recent_avg:.2f}ms")
+                                        if i >= 0 and k >= 0:
+                                            i += 10
+                                            k += 10
+                                            bid = float(msg_bytes[i:find(b'"', i)])
+                                            ask = float(msg_bytes[k:find(b'"', k)])
+                                            
+                                            recv_latency = (recv_end - msg_start) * 1000
+                                            
+                                            latencies[message_count] = recv_latency  # Use receive latency
+                                            if len(window) == 15:
+                                                window_sum -= window[0]
+                                            window.append(recv_latency)
+                                            window_sum += recv_latency
+                                            message_count += 1
+                                            
+                                            # Log every 15 messages with running average
+                                            if message_count % 15 == 0:
+                                                recent_avg = window_sum / 15
+                                                print(f"🔥 OKX #{message_count}: {bid:.2f}/{ask:.2f} | "
+                                                      f"Latency: {recv_latency:.2f}ms | "
+                                                      f"Avg15: {recent_avg:.2f}ms")
+                                    
+                                    except ValueError:
+                                        continue  # Skip malformed messages
                             
-                            except (json.JSONDecodeError, KeyError, IndexError, ValueError):
-                                continue  # Skip malformed messages
-                        
-                    except asyncio.TimeoutError:
-                        consecutive_timeouts += 1
-                        if consecutive_timeouts > 50:  # If too many timeouts, break
-                            print("⚠️ Too many timeouts, connection may be slow")
-                            break
-                        continue
-                    except Exception as e:
-                        continue
-                        
+                            except connection_closed as e:
+                                print(f"❌ OKX connection closed mid-test: {e}")
+                                break
+                            except Exception as e:
+                                continue  # Per-frame parse errors only
+                except timeout_error:
+                    pass  # Test window elapsed
+        
         except Exception as e:
             print(f"❌ OKX connection error: {e}")
             return None
         
-        if latencies:
-            avg_latency = sum(latencies) / len(latencies)
-            min_latency = min(latencies)
-            max_latency = max(latencies)
-            median_latency = sorted(latencies)[len(latencies)//2]
+        if message_count:
+            lat = latencies[:message_count]
+            avg_latency = float(lat.mean())
+            min_latency = float(lat.min())
+            max_latency = float(lat.max())
+            median_latency = float(np.median(lat))
             msg_per_sec = message_count / duration
             
             # Performance analysis
-            under_10ms = len([l for l in latencies if l < 10])
-            under_20ms = len([l for l in latencies if l < 20])
+            under_10ms = int((lat < 10).sum())
+            under_20ms = int((lat < 20).sum())
             
             print(f"✅ OKX OPTIMIZED V2 Results:")
             print(f"   📈 Speed: {msg_per_sec:.1f} msg/s")
@@ -298,8 +329,8 @@ class LatencyReducer:
             print(f"   🚀 Min Latency: {min_latency:.2f}ms")
             print(f"   📊 Max Latency: {max_latency:.2f}ms")
             print(f"   🎯 Median: {median_latency:.2f}ms")
-            print(f"   🔥 Under 10ms: {under_10ms}/{len(latencies)} ({under_10ms/len(latencies)*100:.1f}%)")
-            print(f"   ✅ Under 20ms: {under_20ms}/{len(latencies)} ({under_20ms/len(latencies)*100:.1f}%)")
+            print(f"   🔥 Under 10ms: {under_10ms}/{message_count} ({under_10ms/message_count*100:.1f}%)")
+            print(f"   ✅ Under 20ms: {under_20ms}/{message_count} ({under_20ms/message_count*100:.1f}%)")
             
             success = "✅ TARGET ACHIEVED!" if avg_latency < 20 else "⚠️ GETTING CLOSER" if avg_latency < 30 else "❌ NEEDS MORE WORK"
             print(f"   🎯 Target <20ms: {success}")
@@ -312,7 +343,7 @@ class LatencyReducer:
                 'min_latency': min_latency,
                 'max_latency': max_latency,
                 'median_latency': median_latency,
-                'under_20ms_pct': under_20ms/len(latencies)*100,
+                'under_20ms_pct': under_20ms/message_count*100,
                 'total_messages': message_count
             }
         return None
@@ -321,57 +352,75 @@ class LatencyReducer:
         """Binance reference test"""
         print(f"🚀 Testing Binance REFERENCE for {duration}s...")
         
-        latencies = []
+        latencies = np.empty(int(duration * MAX_MSG_RATE), dtype=np.float64)  # ms samples, filled [:message_count]
         message_count = 0
         url = "wss://stream.binance.com:9443/ws/btcusdt@bookTicker"
         
         try:
-            async with websockets.connect(
+            async with ws_connect(
                 url,
                 ping_interval=None,
                 max_size=1024,
                 compression=None
             ) as ws:
-                start_time = time.perf_counter()
-                
-                while time.perf_counter() - start_time < duration:
-                    try:
-                        msg_start = time.perf_counter()
-                        msg = await ws.recv()
-                        recv_end = time.perf_counter()
-                        
-                        data = fast_json_loads(msg)
-                        if 'b' in data and 'a' in data:
-                            bid = float(data['b'])
-                            ask = float(data['a'])
-                            recv_latency = (recv_end - msg_start) * 1000
-                            latencies.append(recv_latency)
-                            message_count += 1
+                perf = time.perf_counter
+                recv = raw_recv(ws)
+                window = deque(maxlen=50)
+                window_sum = 0.0
+                loads = fast_json_loads
+                timeout = _timeout
+                timeout_error = asyncio.TimeoutError
+                connection_closed = websockets.ConnectionClosed
+                try:
+                    async with timeout(duration):
+                        while True:
+                            try:
+                                msg_start = perf()
+                                msg = await recv()
+                                recv_end = perf()
+                                
+                                data = loads(msg)
+                                if 'b' in data and 'a' in data:
+                                    bid = float(data['b'])
+                                    ask = float(data['a'])
+                                    recv_latency = (recv_end - msg_start) * 1000
+                                    latencies[message_count] = recv_latency
+                                    if len(window) == 50:
+                                        window_sum -= window[0]
+                                    window.append(recv_latency)
+                                    window_sum += recv_latency
+                                    message_count += 1
+                                    
+                                    if message_count % 50 == 0:
+                                        recent_avg = window_sum / 50
+                                        print(f"🔥 Binance #{message_count}: {bid:.2f}/{ask:.2f} | "
+                                              f"Latency: {recv_latency:.2f}ms | "
+                                              f"Avg50: {recent_avg:.2f}ms")
                             
-                            if message_count % 50 == 0:
-                                recent_avg = sum(latencies[-50:]) / min(50, len(latencies))
-                                print(f"🔥 Binance #{message_count}: {bid:.2f}/{ask:.2f} | "
-                                      f"Latency: {recv_latency:.2f}ms | "
-                                      f"Avg50: {recent_avg:.2f}ms")
-                        
-                    except Exception:
-                        continue
-                        
+                            except connection_closed as e:
+                                print(f"❌ Binance connection closed mid-test: {e}")
+                                break
+                            except Exception:
+                                continue  # Per-frame parse errors only
+                except timeout_error:
+                    pass  # Test window elapsed
+        
         except Exception as e:
             print(f"❌ Binance connection error: {e}")
             return None
         
-        if latencies:
-            avg_latency = sum(latencies) / len(latencies)
-            min_latency = min(latencies)
+        if message_count:
+            lat = latencies[:message_count]
+            avg_latency = float(lat.mean())
+            min_latency = float(lat.min())
             msg_per_sec = message_count / duration
-            under_20ms = len([l for l in latencies if l < 20])
+            under_20ms = int((lat < 20).sum())
             
             print(f"✅ Binance REFERENCE Results:")
             print(f"   📈 Speed: {msg_per_sec:.1f} msg/s")
             print(f"   ⚡ Avg Latency: {avg_latency:.2f}ms")
             print(f"   🚀 Min Latency: {min_latency:.2f}ms")
-            print(f"   ✅ Under 20ms: {under_20ms}/{len(latencies)} ({under_20ms/len(latencies)*100:.1f}%)")
+            print(f"   ✅ Under 20ms: {under_20ms}/{message_count} ({under_20ms/message_count*100:.1f}%)")
             
             return {
                 'exchange': 'Binance',
@@ -379,7 +428,7 @@ class LatencyReducer:
                 'msg_per_sec': msg_per_sec,
                 'avg_latency': avg_latency,
                 'min_latency': min_latency,
-                'under_20ms_pct': under_20ms/len(latencies)*100,
+                'under_20ms_pct': under_20ms/message_count*100,
                 'total_messages': message_count
             }
         return None
@@ -460,6 +509,8 @@ async def main():
         print("❌ No successful tests")
 
 if __name__ == "__main__":
+    if HAS_UVLOOP:
+        uvloop.install()
     try:
         asyncio.run(main())
     except KeyboardInterrupt: